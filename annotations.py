@@ -0,0 +1,164 @@
+from array import array
+from collections import Counter
+import argparse
+import csv
+
+from incremental import split_passages
+from process_txt_file import FormCounts, TokenRecord, annotate, get_normalizer
+
+FIELDS = TokenRecord.__slots__
+
+def annotate_passages(text,enclitics=('que',)):
+    """
+    Yield a TokenRecord for every token of a text, passage by
+    passage; sentence and token positions count from zero in
+    each passage, as split_passages divides the text
+    """
+
+    normalizer = get_normalizer()
+    for passage_id, passage in split_passages(text):
+        yield from annotate(normalizer.sentences(passage), enclitics, passage_id)
+
+def annotate_file(filename,enclitics=('que',)):
+    """ Yield a TokenRecord for every token of a .txt file """
+
+    with open(f"./{filename}", "r") as myfile:
+        text = myfile.read()
+    return annotate_passages(text, enclitics)
+
+class TokenTable:
+    """
+
+    TokenTable holds a stream of TokenRecords as columns of
+    integer arrays rather than as objects. Every string is
+    interned once and stored as its id, so a table of a
+    million tokens takes a few dozen megabytes; records are
+    only built again when they are read.
+
+    ...
+
+    Attributes
+    ----------
+    strings : list
+        the interned strings; ids index this list
+
+    Methods
+    -------
+    append(record)
+        Adds a TokenRecord to the end of the table
+
+    extend(records)
+        Adds every TokenRecord of an iterable
+
+    counts()
+        Returns a Counter of the word forms that were not
+        proper nouns, as compile_lemmata counts them
+
+    form_counts()
+        Returns those counts as FormCounts, by exact and by
+        macron-folded spelling
+
+    rows()
+        Yields each record as a tuple in FIELDS order
+
+    """
+
+    def __init__(self,records=()):
+        self.strings = []
+        self._ids = {}
+        self._passages = array('I')
+        self._sentences = array('I')
+        self._tokens = array('I')
+        self._originals = array('I')
+        self._normalized = array('I')
+        self._enclitics = array('I')
+        self._proper = array('B')
+        # id 0 stands for a missing enclitic
+        self._intern('')
+        self.extend(records)
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __getitem__(self,i):
+        string = self.strings
+        return TokenRecord(string[self._passages[i]], self._sentences[i],
+                self._tokens[i], string[self._originals[i]],
+                string[self._normalized[i]], string[self._enclitics[i]] or None,
+                bool(self._proper[i]))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def _intern(self,text):
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def append(self,record):
+        """ Add a TokenRecord to the end of the table """
+
+        intern = self._intern
+        self._passages.append(intern(record.passage))
+        self._sentences.append(record.sentence)
+        self._tokens.append(record.token)
+        self._originals.append(intern(record.original))
+        self._normalized.append(intern(record.normalized))
+        self._enclitics.append(intern(record.enclitic or ''))
+        self._proper.append(record.proper)
+
+    def extend(self,records):
+        """ Add every TokenRecord of an iterable """
+
+        for record in records:
+            self.append(record)
+
+    def counts(self):
+        """ Return a Counter of word forms, ignoring proper nouns """
+
+        ids = Counter(normalized for normalized, proper in
+                zip(self._normalized, self._proper) if not proper)
+        return Counter({self.strings[i]: count for i, count in ids.items()})
+
+    def form_counts(self):
+        """ Return the word form counts by exact and folded spelling """
+
+        return FormCounts(self.counts())
+
+    def rows(self):
+        """ Yield each record as a tuple of its fields """
+
+        for record in self:
+            yield tuple(getattr(record, field) for field in FIELDS)
+
+def write_annotations(records,output):
+    """ Write TokenRecords to a csv file with a header row """
+
+    with open(output, "w", newline="") as f:
+        csv_writer = csv.writer(f, delimiter=",",
+                quotechar="|", quoting=csv.QUOTE_MINIMAL)
+        csv_writer.writerow(FIELDS)
+        for record in records:
+            csv_writer.writerow([record.passage, record.sentence, record.token,
+                    record.original, record.normalized, record.enclitic or '',
+                    int(record.proper)])
+
+def main(argv=None):
+    """ Write a record of every token of a text """
+
+    parser = argparse.ArgumentParser(description=
+            "Write every token of a Latin text with its position and analysis")
+    parser.add_argument("input", nargs="?", default="allAPReadings.txt",
+            help="the .txt file to process")
+    parser.add_argument("-o", "--output", default="annotations.csv",
+            help="where to write the records")
+    parser.add_argument("-e", "--enclitics", nargs="+", default=["que"],
+            choices=["que", "ne", "ve"], help="enclitics to split off")
+    args = parser.parse_args(argv)
+
+    write_annotations(annotate_file(args.input, tuple(args.enclitics)), args.output)
+
+if __name__ == '__main__':
+    main()
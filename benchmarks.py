@@ -0,0 +1,540 @@
+""" Timing harness for the text processing pipeline """
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from cache import BoundedCache
+from make_synopsis import (Noun, PARADIGM_CELLS, Stem, noun_paradigm, paradigm_table,
+        syllabify)
+from process_txt_file import (TextFile, Sentence, Word, ProperNounTagger,
+        compile_lemmata, get_normalizer)
+from reverse_index import read_noun_stems
+import process_txt_file
+
+def sentence_words(filename):
+    """ Return the word lists that compile_lemmata tags, by sentence """
+
+    sentences = []
+    for sentence in TextFile(filename).sentence_tokenizer():
+        sentence = Sentence(sentence)
+        sentence.remove_final_punctuation()
+        sentence.remove_newlines()
+        sentence.remove_non_alpha()
+        sentence.replace_j_and_v()
+        sentences.append([Word(word).word for word in sentence.tokenize()])
+    return sentences
+
+def per_word_proper_nouns(sentences):
+    """ Tag every token with its own ner.tag_ner call, as before """
+
+    from cltk.tag import ner
+
+    verdicts = []
+    for words in sentences:
+        for word in words:
+            result = ner.tag_ner('latin', input_text=word, output_type=list)
+            verdicts.append(len(result) > 0 and len(result[0]) > 1)
+    return verdicts
+
+def batched_proper_nouns(sentences):
+    """ Tag every sentence in one pass with a fresh ProperNounTagger """
+
+    tagger = ProperNounTagger()
+    verdicts = []
+    for words in sentences:
+        verdicts.extend(tagger.tag(words))
+    return verdicts
+
+def bench_proper_nouns(filename='allAPReadings.txt'):
+    """ Print tokens/sec for per-word and batched proper noun tagging """
+
+    sentences = sentence_words(filename)
+    tokens = sum(len(words) for words in sentences)
+
+    results = {}
+    for name, tagger in [('per-word', per_word_proper_nouns),
+            ('batched', batched_proper_nouns)]:
+        start = time.perf_counter()
+        results[name] = tagger(sentences)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: {tokens} tokens in {elapsed:.2f}s "
+                f"({tokens / elapsed:,.0f} tokens/sec)")
+
+    if results['per-word'] != results['batched']:
+        print("warning: batched verdicts differ from per-word verdicts")
+
+class ListStem(Stem):
+    """
+    Stem as it was before the phonology tables were shared and
+    the sound changes were read from SOUND_CHANGES: six lists
+    are built for every stem, vowels are looked up with
+    list.index and each ending is a chain of tests against the
+    lists. Without __slots__, every instance has a __dict__.
+    """
+
+    def __init__(self,stem):
+        super().__init__(stem)
+        self.short_vowels = ['a','e','i','o','u','y']
+        self.long_vowels = ['ā','ē','ī','ō','ū','ӯ']
+        self.all_vowels = self.short_vowels + self.long_vowels
+        self.stops = ['p','b','t','d','c','g','k']
+        self.dentals = ['t','d']
+        self.velars = ['c','g','k']
+
+    def shorten_vowel(self,vowel):
+        return self.short_vowels[self.long_vowels.index(vowel)]
+
+    def lengthen_vowel(self,vowel):
+        return self.long_vowels[self.short_vowels.index(vowel)]
+
+    def vowel_weakening(self,rhotacized):
+        if len(rhotacized) < 2:
+            return rhotacized
+        elif rhotacized[-3] == 'i':
+            return rhotacized
+        elif rhotacized[-2] not in self.short_vowels:
+            return rhotacized
+        else:
+            if rhotacized[-1] == 'r':
+                return rhotacized[:-2] + "e" + rhotacized[-1]
+            else:
+                return rhotacized[:-2] + "i" + rhotacized[-1]
+
+    def rhotacism(self):
+        if self.stem[-1] == 's' and self.stem[-2] in self.all_vowels:
+            return self.stem[:-1] + "r"
+        else:
+            return self.stem
+
+    def oblique(self):
+        return self.vowel_weakening(self.rhotacism())
+
+    def add_s(self):
+        if self.stem[-1] in self.dentals:
+            return self.stem[:-1] + "s"
+        elif self.stem[-1] == 'r':
+            if self.stem[-2] in self.long_vowels:
+                return self.stem[:-2] + self.shorten_vowel(self.stem[-2]) + 'r'
+            else:
+                return self.stem
+        elif self.stem[-1] == 'n':
+            if self.stem[-2] == 'e':
+                return self.stem
+            elif self.stem[-2] in self.short_vowels:
+                return self.stem[:-2] + self.lengthen_vowel(self.stem[-2])
+            else:
+                return self.stem[:-1]
+        elif self.stem[-1] in self.velars:
+            return self.stem[:-1] + 'x'
+        elif self.stem[-1] == "e":
+            return self.stem[:-1] + "ēs"
+        elif self.stem[-1] == 's':
+            return self.stem
+        elif self.stem[-1] != 'o':
+            return self.stem + "s"
+        elif self.stem[-2] != 'r':
+            return self.stem[:-1] + 'us'
+        elif self.stem[-3] not in self.all_vowels:
+            return self.stem[:-2] + 'er'
+        else:
+            from cltk.stem.latin.syllabifier import Syllabifier
+            syllables = Syllabifier().syllabify(self.stem)
+            if len(syllables) != 3:
+                if self.stem == 'uiro':
+                    return 'uir'
+                else:
+                    return self.stem[:-1] + 'us'
+            elif syllables[-2][-1] in self.short_vowels:
+                return self.stem[:-1]
+
+    def add_m(self):
+        if self.stem[-1] == "o":
+            return self.stem[:-1] + "um"
+        elif self.stem[-1] == 'i':
+            return self.stem[:-1] + 'em'
+        elif self.stem[-1] in self.short_vowels and self.stem != 'i':
+            return self.stem + 'm'
+        elif self.stem[-1] in self.long_vowels:
+            return self.stem[:-1] + self.shorten_vowel(self.stem[-1]) + 'm'
+        else:
+            return self.oblique() + 'em'
+
+    def add_ei(self):
+        if self.stem[-1] == 'a':
+            return self.stem + 'e'
+        elif self.stem[-1] == 'o':
+            return self.stem[:-1] + "ī"
+        elif self.stem[-1] in self.short_vowels:
+            return self.stem + "ī"
+        elif self.stem[-1] in self.long_vowels:
+            if self.stem[-1] == "ē" and self.stem[-2] in self.all_vowels:
+                return self.stem + "ī"
+            return self.stem[:-1] + self.shorten_vowel(self.stem[-1]) + "ī"
+        else:
+            return self.oblique() + "ī"
+
+    def add_ns(self):
+        if self.stem[-1] in self.short_vowels:
+            return self.stem[:-1] + self.lengthen_vowel(self.stem[-1]) + "s"
+        elif self.stem[-1] in self.long_vowels:
+            return self.stem + "s"
+        else:
+            return self.oblique() + "ēs"
+
+    def add_sum(self):
+        if self.stem[-1] in self.short_vowels:
+            return self.stem[:-1] + self.lengthen_vowel(self.stem[-1]) + "rum"
+        else:
+            return self.stem + "rum"
+
+    def add_e(self):
+        return self.oblique() + "e"
+
+    def add_is(self):
+        if self.stem[-1] == 'u':
+            return self.stem[:-1] + 'ūs'
+        elif self.stem[-1] in self.short_vowels:
+            return self.stem[:-1] + 'is'
+        else:
+            return self.oblique() + "is"
+
+    def add_eis(self):
+        return self.stem[:-1] + 'īs'
+
+    def add_es(self):
+        if self.stem[-1] == 'i':
+            return self.stem[:-1] + 'ēs'
+        elif self.stem[-1] in self.short_vowels:
+            return self.stem[:-1] + self.lengthen_vowel(self.stem[-1]) + 's'
+        elif self.stem[-1] in self.long_vowels:
+            return self.stem + 's'
+        else:
+            return self.oblique() + 'ēs'
+
+    def add_um(self):
+        if self.stem[-1] in self.all_vowels:
+            return self.stem + 'um'
+        else:
+            return self.oblique() + 'um'
+
+    def add_ibus(self):
+        if self.stem[-1] in self.long_vowels:
+            return self.stem + "bus"
+        elif self.stem[-1] == 'a':
+            return self.stem[:-1] + "ābus"
+        elif self.stem[-1] in self.short_vowels:
+            return self.stem[:-1] + "ibus"
+        else:
+            return self.oblique() + "ibus"
+
+class UnslottedNoun(Noun, ListStem):
+    """
+    A Noun on top of ListStem: Noun's super(Noun, self) calls
+    resolve to ListStem, so every cell runs the old code
+    """
+
+def uncached_paradigm(noun):
+    """ Return every cell of the noun without the paradigm cache """
+
+    return [getattr(noun, cell)() for cell in PARADIGM_CELLS]
+
+def bench_stems(count=200000,filename='ap_pos.csv'):
+    """
+    Print memory per stem object and paradigm cells/sec. Stems
+    whose rules fail are skipped in both runs and counted, so
+    that both time the same cells.
+    """
+
+    stems = read_noun_stems(filename)
+    sample = [stems[i % len(stems)] for i in range(count)]
+
+    failing = set()
+    for cls in (UnslottedNoun, Noun):
+        for stem in stems:
+            try:
+                uncached_paradigm(cls(stem, 'masculine'))
+            except (IndexError, KeyError, TypeError, ValueError):
+                failing.add(stem)
+
+    paradigms = {}
+    for name, cls in [('unslotted', UnslottedNoun), ('slotted', Noun)]:
+        tracemalloc.start()
+        nouns = [cls(stem, 'masculine') for stem in sample]
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        working = [noun for noun in nouns[:len(stems)] if noun.stem not in failing]
+        start = time.perf_counter()
+        paradigms[name] = [uncached_paradigm(noun) for noun in working]
+        elapsed = time.perf_counter() - start
+        cells = sum(len(paradigm) for paradigm in paradigms[name])
+
+        print(f"{name:>10}: {size / count:,.0f} bytes/stem, "
+                f"{cells / elapsed:,.0f} cells/sec")
+        del nouns
+
+    print(f"{len(failing)} of {len(stems)} stems skipped: the rules fail on them")
+    if paradigms['unslotted'] != paradigms['slotted']:
+        print("warning: slotted paradigms differ from unslotted paradigms")
+
+def reset_caches():
+    """ Empty the module-level caches so every run starts cold """
+
+    tagger_cache = process_txt_file.proper_noun_tagger.cache
+    process_txt_file.proper_noun_tagger.cache = BoundedCache(tagger_cache.maxsize)
+    noun_paradigm.cache_clear()
+    syllabify.cache_clear()
+
+def percentiles(samples):
+    """ Return the 50th, 90th and 99th percentiles of samples """
+
+    if len(samples) < 2:
+        value = samples[0] if samples else None
+        return {'p50': value, 'p90': value, 'p99': value}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p90': cuts[89], 'p99': cuts[98]}
+
+def timed(items):
+    """
+    Call each function in items; return (units, per call
+    latencies, skipped), where a call that returns None was
+    skipped
+    """
+
+    units = 0
+    skipped = 0
+    latencies = []
+    for function in items:
+        start = time.perf_counter()
+        done = function()
+        latencies.append(time.perf_counter() - start)
+        if done is None:
+            skipped += 1
+        else:
+            units += done
+    return units, latencies, skipped
+
+def corpus_workload(filename):
+    """ Return a workload compiling filename end to end """
+
+    def run():
+        start = time.perf_counter()
+        tokens = sum(compile_lemmata(filename).values())
+        return tokens, [time.perf_counter() - start], 0
+    return run
+
+def normalization_workload(filename,enclitics=('que',)):
+    """
+    Return a workload tokenizing every sentence of filename as
+    annotate() does, splitting enclitics as it goes
+    """
+
+    sentences = list(TextFile(filename).iter_sentences())
+    normalizer = get_normalizer()
+
+    def run():
+        return timed(lambda sentence=sentence: len(normalizer.tokenize(sentence, enclitics))
+                for sentence in sentences)
+    return run
+
+def words_workload(filename):
+    """ Return a workload tagging names and splitting enclitics """
+
+    normalizer = get_normalizer()
+    sentences = [[token.text for token in normalizer.tokenize(sentence)]
+            for sentence in TextFile(filename).iter_sentences()]
+
+    def handle(words):
+        words = [Word(word) for word in words]
+        tagger = process_txt_file.proper_noun_tagger
+        for word, proper_noun in zip(words, tagger.tag([word.word for word in words])):
+            if not proper_noun:
+                word.lower_case()
+                word.identify_enclitic()
+        return len(words)
+
+    def run():
+        return timed(lambda words=words: handle(words) for words in sentences)
+    return run
+
+def paradigm_workload(filename='ap_pos.csv'):
+    """ Return a workload generating the paradigm of every noun stem """
+
+    stems = read_noun_stems(filename)
+
+    def generate(stem):
+        # a stem the rules fail on is counted as skipped
+        try:
+            return len(noun_paradigm(stem, None))
+        except (IndexError, KeyError, TypeError):
+            return None
+
+    def run():
+        return timed(lambda stem=stem: generate(stem) for stem in stems)
+    return run
+
+def batch_paradigm_workload(filename='ap_pos.csv'):
+    """ Return a workload generating every noun stem's paradigm at once """
+
+    stems = read_noun_stems(filename)
+
+    def run():
+        start = time.perf_counter()
+        table = paradigm_table(stems)
+        elapsed = time.perf_counter() - start
+        cells = sum(len(forms) for forms in table.values() if forms)
+        skipped = sum(1 for forms in table.values() if forms is None)
+        return cells, [elapsed], skipped
+    return run
+
+def measure(workload,unit,repeats=3):
+    """
+    Run a workload repeats times from cold caches, then once more
+    under tracemalloc for its peak memory. Throughput uses the
+    median run; latencies are per item of the last run, or per
+    run for workloads that are one item. Items the workload
+    could not do are reported as skipped.
+    """
+
+    totals = []
+    for _ in range(repeats):
+        reset_caches()
+        start = time.perf_counter()
+        units, latencies, skipped = workload()
+        totals.append(time.perf_counter() - start)
+
+    reset_caches()
+    tracemalloc.start()
+    workload()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    median = statistics.median(totals)
+    return {
+            'unit': unit,
+            'units': units,
+            'skipped': skipped,
+            'seconds': median,
+            'throughput': units / median if median else None,
+            'peak_memory_bytes': peak,
+            'latency_seconds': percentiles(latencies if len(latencies) > 1 else totals),
+            }
+
+def git_commit():
+    """ Return the current commit, or None outside a git checkout """
+
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(filename='allAPReadings.txt',lexicon='ap_pos.csv',scales=(1, 10, 100),
+        repeats=3):
+    """ Return the results of every workload as a dict """
+
+    results = {}
+    with open(f"./{filename}") as f:
+        text = f.read()
+
+    # TextFile reads paths relative to the working directory
+    with tempfile.TemporaryDirectory(dir='.') as directory:
+        directory = os.path.relpath(directory)
+        for scale in scales:
+            if scale == 1:
+                corpus = filename
+            else:
+                corpus = os.path.join(directory, f"corpus_{scale}x.txt")
+                with open(corpus, 'w') as f:
+                    for _ in range(scale):
+                        f.write(text)
+                        f.write("\n")
+            results[f"compile_lemmata {scale}x"] = measure(
+                    corpus_workload(corpus), 'tokens', repeats)
+
+    results['normalization'] = measure(normalization_workload(filename),
+            'tokens', repeats)
+    results['names and enclitics'] = measure(words_workload(filename),
+            'tokens', repeats)
+    results['noun paradigms'] = measure(paradigm_workload(lexicon),
+            'cells', repeats)
+    results['noun paradigms, batch'] = measure(batch_paradigm_workload(lexicon),
+            'cells', repeats)
+
+    return {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'workloads': results,
+            }
+
+def print_results(results,previous=None):
+    """ Print a table of results, with the change from previous """
+
+    print(f"{'workload':<26}{'per sec':>14}{'unit':>12}{'p50 ms':>10}{'p99 ms':>10}"
+            f"{'peak MB':>10}{'skipped':>10}{'change':>10}")
+    for name, result in results['workloads'].items():
+        latency = result['latency_seconds']
+        change = ''
+        if previous and name in previous['workloads']:
+            before = previous['workloads'][name]['throughput']
+            if before and result['throughput']:
+                change = f"{result['throughput'] / before - 1:+.1%}"
+        print(f"{name:<26}{result['throughput'] or 0:>14,.0f}{result['unit']:>12}"
+                f"{latency['p50'] * 1000:>10.3f}{latency['p99'] * 1000:>10.3f}"
+                f"{result['peak_memory_bytes'] / 2 ** 20:>10.1f}"
+                f"{result.get('skipped', 0):>10}{change:>10}")
+
+def main(argv=None):
+    """ Run a benchmark from the command line """
+
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline")
+    subparsers = parser.add_subparsers(dest='benchmark')
+
+    suite = subparsers.add_parser('suite', help="run every workload")
+    suite.add_argument("--input", default="allAPReadings.txt")
+    suite.add_argument("--lexicon", default="ap_pos.csv")
+    suite.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+            help="sizes of the synthetic corpora, as multiples of the input")
+    suite.add_argument("--repeats", type=int, default=3)
+    suite.add_argument("-o", "--output", help="save the results as json")
+    suite.add_argument("--compare", metavar="JSON",
+            help="results of an earlier run to compare against")
+
+    proper_nouns = subparsers.add_parser('proper-nouns',
+            help="per-word against batched proper noun tagging")
+    proper_nouns.add_argument("--input", default="allAPReadings.txt")
+
+    stems = subparsers.add_parser('stems',
+            help="memory and speed of slotted stem objects")
+    stems.add_argument("--count", type=int, default=200000)
+    stems.add_argument("--lexicon", default="ap_pos.csv")
+
+    args = parser.parse_args(argv)
+
+    if args.benchmark == 'proper-nouns':
+        bench_proper_nouns(args.input)
+    elif args.benchmark == 'stems':
+        bench_stems(args.count, args.lexicon)
+    elif args.benchmark == 'suite':
+        results = run_suite(args.input, args.lexicon, args.scales, args.repeats)
+        previous = None
+        if args.compare:
+            with open(args.compare) as f:
+                previous = json.load(f)
+        print_results(results, previous)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+    else:
+        parser.print_help()
+
+if __name__ == '__main__':
+    main()
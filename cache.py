@@ -0,0 +1,78 @@
+from collections import OrderedDict
+import threading
+
+_MISSING = object()
+
+class BoundedCache:
+    """
+
+    BoundedCache is a small least-recently-used mapping that
+    keeps at most maxsize entries and counts its hits and
+    misses so that callers can see how useful it has been.
+    A lock makes each lookup and store atomic, so one cache
+    can be shared by threads, as the service's workers do.
+
+    ...
+
+    Attributes
+    ----------
+    maxsize : int
+        the largest number of entries kept before the least
+        recently used entry is evicted
+
+    hits : int
+        the number of lookups that found an entry
+
+    misses : int
+        the number of lookups that found nothing
+
+    Methods
+    -------
+    get(key, default)
+        Returns the cached value for key, or default
+
+    put(key, value)
+        Stores value under key, evicting the oldest entry
+        if the cache is full
+
+    hit_rate()
+        Returns the fraction of lookups that were hits
+
+    """
+
+    def __init__(self,maxsize=65536):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self,key,default=None):
+        """ Return the cached value for key, or default """
+
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self,key,value):
+        """ Store value under key, evicting the oldest entry """
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def hit_rate(self):
+        """ Return the fraction of lookups that were hits """
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -0,0 +1,360 @@
+from array import array
+from collections import namedtuple
+import argparse
+import bisect
+import struct
+
+from incremental import PASSAGE_HEADER, is_author_line, split_passages
+from process_txt_file import get_normalizer
+
+Occurrence = namedtuple('Occurrence', ['passage', 'line', 'token'])
+
+MAGIC = b'LATCON\x00\x01'
+# magic, passages, terms, string blob bytes, postings bytes
+HEADER = struct.Struct('<8sIIII')
+
+def _write_varint(out,value):
+    """ Append value to out in seven bit groups, low group first """
+
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def encode_postings(postings):
+    """
+    Return (passage, line, token) triples, sorted, as bytes:
+    the passage as a delta from the previous one, the line as
+    a delta within the same passage, and the token position,
+    each as a varint
+    """
+
+    out = bytearray()
+    passage = line = 0
+    for next_passage, next_line, token in postings:
+        if next_passage != passage:
+            _write_varint(out, next_passage - passage)
+            _write_varint(out, next_line)
+        else:
+            out.append(0)
+            _write_varint(out, next_line - line)
+        _write_varint(out, token)
+        passage, line = next_passage, next_line
+    return bytes(out)
+
+def decode_postings(data):
+    """ Return the (passage, line, token) triples of encode_postings() """
+
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+
+    postings = []
+    passage = line = 0
+    for i in range(0, len(values), 3):
+        passage_delta, line_value, token = values[i:i + 3]
+        if passage_delta:
+            passage += passage_delta
+            line = line_value
+        else:
+            line += line_value
+        postings.append((passage, line, token))
+    return postings
+
+def first_line(header):
+    """
+    Return the number of the first line of a range such as
+    '1.418-440', the line after the book, or '210-400'
+    """
+
+    start = header.strip().split('-')[0]
+    return int(start.rsplit('.', 1)[-1])
+
+def numbered_lines(passage):
+    """
+    Yield (line number, line) for the text of a passage from
+    split_passages(). The range, and the author line directly
+    above it, are left out, and lines are numbered from the
+    first line of the range, so that a line's number is its
+    verse, or its section in prose printed a section a line.
+    Blank lines are not counted.
+    """
+
+    lines = passage.splitlines()
+    number = 1
+    for i, line in enumerate(lines[:2]):
+        if PASSAGE_HEADER.match(line) and (i == 0 or is_author_line(lines[0])):
+            number = first_line(line)
+            lines = lines[i + 1:]
+            break
+
+    for line in lines:
+        if line.strip():
+            yield number, line
+            number += 1
+
+def index_text(text,enclitics=('que',)):
+    """
+    Return a list of passage ids and a dict of word form to a
+    flat array of (passage, line, token) triples. Every word is
+    indexed under the form compile_lemmata counts, lower case
+    and without its enclitic; proper nouns are included. Lines
+    are numbered as in the text, e.g. 1 for the first line of
+    'Vergil 1.1-209', and tokens count from the start of their
+    line.
+    """
+
+    normalizer = get_normalizer()
+    passages = []
+    postings = {}
+    for passage, (passage_id, passage_text) in enumerate(split_passages(text)):
+        passages.append(passage_id)
+        for line_number, line in numbered_lines(passage_text):
+            for token_number, token in enumerate(normalizer.tokenize(line, enclitics)):
+                form = token.base.lower()
+                triples = postings.get(form)
+                if triples is None:
+                    triples = postings[form] = array('I')
+                triples.extend((passage, line_number, token_number))
+    return passages, postings
+
+class Concordance:
+    """
+
+    Concordance is an inverted index of a text: for every word
+    form, where it occurs, as (passage, line, token) postings.
+    The postings of each form are delta-encoded varints in one
+    shared byte array, so the index stays small on disk and in
+    memory, and a form's postings are only decoded when it is
+    queried.
+
+    ...
+
+    Attributes
+    ----------
+    passages : list
+        passage ids, e.g. 'Vergil 1.1-209'; a posting's passage
+        indexes this
+
+    Methods
+    -------
+    build(filename, enclitics)
+        Returns the concordance of a .txt file
+
+    occurrences(form)
+        Returns a list of Occurrences of a word form
+
+    lemma_occurrences(lemma, lemmatizer)
+        Returns a list of Occurrences of every form the
+        lexicons give for a lemma
+
+    cooccurrences(first, second, lines)
+        Returns pairs of Occurrences of two forms no more
+        than lines apart in the same passage
+
+    save(path)
+        Writes the concordance to a binary file
+
+    load(path)
+        Returns a concordance read from a binary file
+
+    """
+
+    def __init__(self,passages,terms,postings):
+        self.passages = passages
+        # form -> (start, end) of its postings in self._postings
+        self._terms = terms
+        self._postings = postings
+        self._lemmata = {}
+
+    @classmethod
+    def from_postings(cls,passages,postings):
+        """ Return a concordance of the postings from index_text() """
+
+        terms = {}
+        blob = bytearray()
+        for form in sorted(postings):
+            triples = postings[form]
+            start = len(blob)
+            blob += encode_postings(zip(triples[0::3], triples[1::3], triples[2::3]))
+            terms[form] = (start, len(blob))
+        return cls(passages, terms, bytes(blob))
+
+    @classmethod
+    def build(cls,filename,enclitics=('que',)):
+        """ Return the concordance of a .txt file """
+
+        with open(f"./{filename}", "r") as myfile:
+            text = myfile.read()
+        return cls.from_postings(*index_text(text, enclitics))
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __contains__(self,form):
+        return form in self._terms
+
+    def forms(self):
+        """ Return the indexed word forms, sorted """
+
+        return sorted(self._terms)
+
+    def _decode(self,form):
+        span = self._terms.get(form)
+        if span is None:
+            return []
+        return decode_postings(self._postings[span[0]:span[1]])
+
+    def occurrences(self,form):
+        """ Return a list of the Occurrences of a word form """
+
+        passages = self.passages
+        return [Occurrence(passages[passage], line, token)
+                for passage, line, token in self._decode(form)]
+
+    def lemma_forms(self,lemma,lemmatizer=None):
+        """
+        Return the indexed forms the lexicons give for a lemma;
+        cltk is not consulted, so the answer comes from the
+        curated lexicons alone
+        """
+
+        if lemmatizer is None:
+            from lemmatizer import get_lemmatizer
+            lemmatizer = get_lemmatizer()
+
+        # lemma -> forms, built once for each lemmatizer asked
+        by_lemma = self._lemmata.get(lemmatizer)
+        if by_lemma is None:
+            from tokenizer import fold_macrons
+
+            by_lemma = self._lemmata[lemmatizer] = {}
+            for form in self._terms:
+                lemmata = (lemmatizer.forms.get(form)
+                        or lemmatizer.folded.get(fold_macrons(form), ()))
+                for each in lemmata:
+                    by_lemma.setdefault(each, []).append(form)
+        return by_lemma.get(lemma, [])
+
+    def lemma_occurrences(self,lemma,lemmatizer=None):
+        """ Return the Occurrences of every form of a lemma, in text order """
+
+        postings = []
+        for form in self.lemma_forms(lemma, lemmatizer):
+            postings.extend(self._decode(form))
+        passages = self.passages
+        return [Occurrence(passages[passage], line, token)
+                for passage, line, token in sorted(postings)]
+
+    def cooccurrences(self,first,second,lines=0):
+        """
+        Return (first, second) pairs of Occurrences in the same
+        passage and no more than lines apart; each list of
+        postings is walked once, with a window over the second
+        """
+
+        passages = self.passages
+        seconds = self._decode(second)
+        keys = [(passage, line) for passage, line, token in seconds]
+
+        pairs = []
+        for passage, line, token in self._decode(first):
+            start = bisect.bisect_left(keys, (passage, line - lines))
+            end = bisect.bisect_right(keys, (passage, line + lines))
+            for other in seconds[start:end]:
+                if other != (passage, line, token):
+                    pairs.append((Occurrence(passages[passage], line, token),
+                            Occurrence(passages[other[0]], other[1], other[2])))
+        return pairs
+
+    def save(self,path):
+        """ Write the concordance to a binary file """
+
+        strings = list(self.passages) + list(self._terms)
+        offsets = array('I', [0])
+        blob = bytearray()
+        for text in strings:
+            blob += text.encode('utf-8')
+            offsets.append(len(blob))
+        ends = array('I', [end for start, end in self._terms.values()])
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(self.passages), len(self._terms),
+                    len(blob), len(self._postings)))
+            f.write(offsets.tobytes())
+            f.write(ends.tobytes())
+            f.write(blob)
+            f.write(self._postings)
+
+    @classmethod
+    def load(cls,path):
+        """ Return a concordance read from a file written by save() """
+
+        with open(path, 'rb') as f:
+            magic, n_passages, n_terms, blob_size, postings_size = \
+                    HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a concordance")
+            offsets = array('I')
+            offsets.frombytes(f.read((n_passages + n_terms + 1) * 4))
+            ends = array('I')
+            ends.frombytes(f.read(n_terms * 4))
+            blob = f.read(blob_size)
+            postings = f.read(postings_size)
+
+        strings = [blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+                for i in range(n_passages + n_terms)]
+        terms = {}
+        start = 0
+        for form, end in zip(strings[n_passages:], ends):
+            terms[form] = (start, end)
+            start = end
+        return cls(strings[:n_passages], terms, postings)
+
+def main(argv=None):
+    """ Build a concordance, or query a saved one """
+
+    parser = argparse.ArgumentParser(description=
+            "Build and query a concordance of a Latin text")
+    parser.add_argument("forms", nargs="*",
+            help="forms to look up; with two forms, where they occur together")
+    parser.add_argument("-i", "--input", default="allAPReadings.txt",
+            help="the .txt file to index")
+    parser.add_argument("-c", "--concordance", default="concordance.idx",
+            help="the saved concordance to build or read")
+    parser.add_argument("-b", "--build", action="store_true",
+            help="index the input and save the concordance first")
+    parser.add_argument("-l", "--lemma", action="store_true",
+            help="look the forms up as lemmata")
+    parser.add_argument("-n", "--lines", type=int, default=0,
+            help="how many lines apart two forms may be")
+    args = parser.parse_args(argv)
+
+    if args.build:
+        concordance = Concordance.build(args.input)
+        concordance.save(args.concordance)
+        print(f"{len(concordance)} forms in {len(concordance.passages)} passages")
+    else:
+        concordance = Concordance.load(args.concordance)
+
+    if len(args.forms) == 2 and not args.lemma:
+        for first, second in concordance.cooccurrences(*args.forms, args.lines):
+            print(f"{first.passage}\t{first.line}\t{first.token}\t{second.line}\t{second.token}")
+        return
+
+    for form in args.forms:
+        if args.lemma:
+            occurrences = concordance.lemma_occurrences(form)
+        else:
+            occurrences = concordance.occurrences(form)
+        for occurrence in occurrences:
+            print(f"{form}\t{occurrence.passage}\t{occurrence.line}\t{occurrence.token}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+from array import array
+import os
+import sys
+
+from tokenizer import fold_macrons
+from writers import merge_counts, read_run, write_run
+
+# bytes a form costs in the dict beyond its string: the entry and,
+# past the small ints Python shares, its count
+ENTRY_OVERHEAD = 100
+
+class Segment:
+    """
+
+    Segment holds (form, count) pairs sorted by form in three
+    flat buffers: the UTF-8 forms back to back, the offset
+    where each form ends and the counts. A form costs its
+    bytes plus twelve, instead of a dict entry, a str and an
+    int object.
+
+    """
+
+    __slots__ = ('blob', 'ends', 'counts')
+
+    def __init__(self,items):
+        blob = bytearray()
+        self.ends = array('I')
+        self.counts = array('q')
+        for form, count in items:
+            blob += form.encode('utf-8')
+            self.ends.append(len(blob))
+            self.counts.append(count)
+        self.blob = bytes(blob)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __iter__(self):
+        blob = self.blob
+        start = 0
+        for end, count in zip(self.ends, self.counts):
+            yield blob[start:end].decode('utf-8'), count
+            start = end
+
+    def nbytes(self):
+        """ the memory the buffers take """
+        return len(self.blob) + len(self.ends) * 4 + len(self.counts) * 8
+
+class FrequencyStore:
+    """
+
+    FrequencyStore counts word forms in a bounded amount of
+    memory. New counts go into a dict of at most table_size
+    forms; when it fills it is sorted and frozen into a compact
+    Segment, in which each form is stored once as UTF-8 bytes
+    beside an integer array of counts, and segments are merged
+    together as they accumulate. As soon as a new form takes
+    the estimated size past max_bytes, everything in memory is
+    merged into one sorted run on disk and counting starts
+    afresh; past max_runs runs they are merged into one.
+    items() merges the dict, the segments and the runs back in
+    sorted order, adding up the counts of a form wherever it
+    is, so the whole vocabulary is never in memory at once.
+    Adding a form never looks beyond the dict; the number of
+    distinct forms is counted by the first len() after new
+    forms were added.
+
+    It has update() and items() like a Counter, so it can be
+    passed to compile_lemmata and write_unique_forms.
+
+    ...
+
+    Attributes
+    ----------
+    max_bytes : int
+        roughly how much memory the counts may take before
+        they are spilled
+
+    table_size : int
+        how many forms are counted in a dict before it is
+        frozen into a Segment
+
+    max_runs : int
+        how many runs are kept on disk before they are merged
+        into one
+
+    directory : str
+        where runs are written; the system default if None
+
+    fold : bool
+        whether forms are counted with their macrons folded
+
+    runs : list
+        the run files spilled so far
+
+    Methods
+    -------
+    add(form, count)
+        Adds to the count of one form
+
+    update(word_forms)
+        Adds the counts of a dict of word forms
+
+    items()
+        Yields every (form, count) pair, sorted by form
+
+    spill()
+        Writes the counts in memory to a run
+
+    nbytes()
+        Returns an estimate of the memory the counts take
+
+    close()
+        Removes the run files
+
+    """
+
+    def __init__(self,max_bytes=256 << 20,table_size=1 << 16,directory=None,
+            max_segments=8,max_runs=16,fold=False):
+        self.max_bytes = max_bytes
+        self.table_size = table_size
+        self.max_segments = max_segments
+        self.max_runs = max_runs
+        self.directory = directory
+        self.fold = fold
+        self.runs = []
+        self._table = {}
+        self._table_bytes = 0
+        self._segments = []
+        self._segment_bytes = 0
+        # the number of distinct forms, or None until len() counts them
+        self._length = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc_info):
+        self.close()
+
+    def __len__(self):
+        if not self.runs and not self._segments:
+            return len(self._table)
+        if self._length is None:
+            # a form may be counted in several places until they are merged
+            self._length = sum(1 for item in self.items())
+        return self._length
+
+    def nbytes(self):
+        """ Return an estimate of the memory the counts take """
+
+        return self._table_bytes + self._segment_bytes
+
+    def add(self,form,count=1):
+        """ Add to the count of one form """
+
+        if self.fold:
+            form = fold_macrons(form)
+        table = self._table
+        if form in table:
+            table[form] += count
+            return
+
+        self._length = None
+        table[form] = count
+        self._table_bytes += sys.getsizeof(form) + ENTRY_OVERHEAD
+        if self._table_bytes + self._segment_bytes > self.max_bytes:
+            self.spill()
+        elif len(table) >= self.table_size:
+            self._freeze()
+
+    def update(self,word_forms):
+        """ Add the counts of a dict of word forms """
+
+        for form, count in word_forms.items():
+            self.add(form, count)
+
+    def _freeze(self):
+        """ Move the dict into a Segment, merging segments if many """
+
+        if self._table:
+            self._segments.append(Segment(sorted(self._table.items())))
+            self._table = {}
+            self._table_bytes = 0
+        if len(self._segments) > self.max_segments:
+            self._segments = [Segment(merge_counts(*self._segments))]
+        self._segment_bytes = sum(segment.nbytes() for segment in self._segments)
+
+    def spill(self):
+        """ Write the counts in memory to one sorted run on disk """
+
+        if not self._table and not self._segments:
+            return
+        self.runs.append(write_run(self._in_memory(), self.directory))
+        self._clear()
+        if len(self.runs) > self.max_runs:
+            # keep the final merge to a few open files
+            runs = self.runs
+            self.runs = [write_run(merge_counts(*[read_run(path) for path in runs]),
+                    self.directory)]
+
+    def _clear(self):
+        self._table = {}
+        self._table_bytes = 0
+        self._segments = []
+        self._segment_bytes = 0
+
+    def _in_memory(self):
+        """ the counts in memory, merged in sorted order """
+        return merge_counts(sorted(self._table.items()), *self._segments)
+
+    def items(self):
+        """ Yield every (form, count) pair in order of form """
+
+        runs = [read_run(path, remove=False) for path in self.runs]
+        return merge_counts(self._in_memory(), *runs)
+
+    def close(self):
+        """ Remove the run files and drop the counts """
+
+        for path in self.runs:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.runs = []
+        self._clear()
+        self._length = 0
@@ -0,0 +1,324 @@
+import argparse
+
+from tokenizer import ENCLITIC_RULES, MACRON_TABLE
+
+# the key forms are compared under: lower case, no macrons, J/V as I/U
+KEY_TABLE = dict(MACRON_TABLE)
+KEY_TABLE.update(str.maketrans('jv', 'iu'))
+
+def match_key(form):
+    """ Return the spelling a form is matched under """
+
+    return form.lower().translate(KEY_TABLE)
+
+def edit_distance(first,second,limit=None):
+    """
+    Return the Levenshtein distance between two strings; once
+    it is certain to be more than limit, limit + 1 is returned
+    without finishing the table
+    """
+
+    # a shared beginning or end never adds to the distance
+    start = 0
+    shortest = min(len(first), len(second))
+    while start < shortest and first[start] == second[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and first[-1 - end] == second[-1 - end]:
+        end += 1
+    first = first[start:len(first) - end]
+    second = second[start:len(second) - end]
+
+    if len(first) < len(second):
+        first, second = second, first
+    if not second:
+        return len(first) if limit is None else min(len(first), limit + 1)
+    if limit is not None and len(first) - len(second) > limit:
+        return limit + 1
+
+    previous = list(range(len(second) + 1))
+    for i, letter in enumerate(first, 1):
+        current = [i]
+        left = i
+        for j, other in enumerate(second):
+            cost = previous[j] if letter == other else previous[j] + 1
+            above = previous[j + 1] + 1
+            if above < cost:
+                cost = above
+            if left + 1 < cost:
+                cost = left + 1
+            current.append(cost)
+            left = cost
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+class PrefixTrie:
+    """
+
+    PrefixTrie stores words letter by letter in nested dicts,
+    so that every stored word that begins a given string, or
+    that a given string begins, is found by walking it once
+
+    ...
+
+    Methods
+    -------
+    add(word)
+        Stores a word
+
+    prefixes_of(word)
+        Returns the stored words that word begins with,
+        shortest first
+
+    completions(prefix, limit)
+        Returns up to limit stored words starting with prefix
+
+    """
+
+    # marks a node where a stored word ends
+    END = ''
+
+    def __init__(self,words=()):
+        self._root = {}
+        self._length = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return self._length
+
+    def add(self,word):
+        """ Store a word """
+
+        node = self._root
+        for letter in word:
+            node = node.setdefault(letter, {})
+        if self.END not in node:
+            node[self.END] = True
+            self._length += 1
+
+    def prefixes_of(self,word):
+        """ Return the stored words that word starts with """
+
+        found = []
+        node = self._root
+        for i, letter in enumerate(word):
+            node = node.get(letter)
+            if node is None:
+                break
+            if self.END in node:
+                found.append(word[:i + 1])
+        return found
+
+    def completions(self,prefix,limit=20):
+        """ Return up to limit stored words that start with prefix """
+
+        node = self._root
+        for letter in prefix:
+            node = node.get(letter)
+            if node is None:
+                return []
+
+        found = []
+        stack = [(prefix, node)]
+        while stack and len(found) < limit:
+            word, node = stack.pop()
+            for letter, child in sorted(node.items(), reverse=True):
+                if letter == self.END:
+                    found.append(word)
+                else:
+                    stack.append((word + letter, child))
+        return found[:limit]
+
+class BKTree:
+    """
+
+    BKTree indexes words by edit distance: each child of a
+    node sits at a fixed distance from it, so by the triangle
+    inequality a search only descends into children whose
+    distance is within max_distance of the query's distance
+    to the node, and most of the tree is never compared.
+
+    ...
+
+    Methods
+    -------
+    add(word)
+        Stores a word
+
+    search(word, max_distance)
+        Returns (distance, word) pairs within max_distance,
+        nearest first
+
+    """
+
+    def __init__(self,words=()):
+        # a node is [word, {distance: child node}]
+        self._root = None
+        self._length = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return self._length
+
+    def add(self,word):
+        """ Store a word """
+
+        if self._root is None:
+            self._root = [word, {}]
+            self._length = 1
+            return
+
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                self._length += 1
+                return
+            node = child
+
+    def search(self,word,max_distance=1):
+        """ Return (distance, word) pairs within max_distance """
+
+        if self._root is None:
+            return []
+
+        found = []
+        stack = [self._root]
+        while stack:
+            stored, children = stack.pop()
+            distance = edit_distance(word, stored)
+            if distance <= max_distance:
+                found.append((distance, stored))
+            low, high = distance - max_distance, distance + max_distance
+            for child_distance, child in children.items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+        found.sort()
+        return found
+
+class FuzzyMatcher:
+    """
+
+    FuzzyMatcher suggests lexicon forms, and so lemmata, for a
+    word form the lexicons do not contain. Forms are compared
+    in lower case without macrons and with J/V as I/U, so that
+    spelling variants match at distance zero. The trie finds
+    forms that an unknown word begins with, such as a word
+    whose enclitic was not split off; the BK-tree finds the
+    forms within a small edit distance, such as a misprint or
+    a wrong i/u.
+
+    ...
+
+    Attributes
+    ----------
+    forms : dict
+        lexicon form -> tuple of lemmata
+
+    keys : dict
+        match key -> list of lexicon forms with that key
+
+    Methods
+    -------
+    candidates(form, max_distance)
+        Returns a list of (distance, lexicon form, lemmata)
+
+    candidates_many(forms, max_distance)
+        Returns a dict of each distinct form and its candidates
+
+    unknown(forms)
+        Returns the forms that are not in the lexicons
+
+    """
+
+    def __init__(self,forms=None):
+        if forms is None:
+            from lemmatizer import get_lemmatizer
+            forms = get_lemmatizer().forms
+        self.forms = forms
+
+        self.keys = {}
+        for form in forms:
+            self.keys.setdefault(match_key(form), []).append(form)
+        self.trie = PrefixTrie(self.keys)
+        self.tree = BKTree(sorted(self.keys))
+
+    def unknown(self,forms):
+        """ Return the distinct forms that are not in the lexicons """
+
+        keys = self.keys
+        return [form for form in dict.fromkeys(forms)
+                if form not in self.forms and match_key(form) not in keys]
+
+    def candidates(self,form,max_distance=1):
+        """
+        Return (distance, lexicon form, lemmata) tuples for form,
+        nearest first; a lexicon form that form begins with,
+        leaving only an enclitic, counts as distance zero
+        """
+
+        key = match_key(form)
+        matches = {}
+        for distance, match in self.tree.search(key, max_distance):
+            matches[match] = distance
+        for prefix in self.trie.prefixes_of(key):
+            if key[len(prefix):] in ENCLITIC_RULES:
+                matches[prefix] = 0
+
+        found = []
+        for match, distance in matches.items():
+            for lexicon_form in self.keys[match]:
+                found.append((distance, lexicon_form, self.forms[lexicon_form]))
+        found.sort()
+        return found
+
+    def candidates_many(self,forms,max_distance=1):
+        """
+        Return a dict of each distinct form and its candidates;
+        forms that share a match key are searched once
+        """
+
+        by_key = {}
+        results = {}
+        for form in forms:
+            if form in results:
+                continue
+            key = match_key(form)
+            if key not in by_key:
+                by_key[key] = self.candidates(form, max_distance)
+            results[form] = by_key[key]
+        return results
+
+def main(argv=None):
+    """ Print lexicon candidates for the unknown forms of a text """
+
+    parser = argparse.ArgumentParser(description=
+            "Suggest lexicon forms for word forms missing from the lexicons")
+    parser.add_argument("input", nargs="?", default="allAPReadings.txt",
+            help="the .txt file to process")
+    parser.add_argument("-d", "--distance", type=int, default=1,
+            help="the largest edit distance to suggest")
+    args = parser.parse_args(argv)
+
+    from process_txt_file import compile_lemmata
+
+    matcher = FuzzyMatcher()
+    unknown = matcher.unknown(compile_lemmata(args.input))
+    results = matcher.candidates_many(unknown, args.distance)
+    for form, candidates in sorted(results.items()):
+        suggestions = ", ".join(f"{lexicon_form} ({'/'.join(lemmata)}; {distance})"
+                for distance, lexicon_form, lemmata in candidates[:5])
+        print(f"{form}\t{suggestions or '-'}")
+    matched = sum(1 for candidates in results.values() if candidates)
+    print(f"{len(unknown)} unknown forms, {matched} with candidates")
+
+if __name__ == '__main__':
+    main()
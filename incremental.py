@@ -0,0 +1,201 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
+import re
+
+from process_txt_file import count_word_forms, get_normalizer
+from profiling import NULL_PROFILER, Profiler
+
+# bump this whenever a change to the pipeline changes the counts, so
+# that passages cached by an older version are processed again
+CACHE_VERSION = 5
+
+PASSAGE_HEADER = re.compile(r'^\s*\d+(\.\d+)?-\d+(\.\d+)?\s*$')
+
+def is_author_line(line):
+    """ Return True if a line is a lone name such as 'Vergil' """
+
+    line = line.strip().lstrip('\ufeff')
+    return line.isalpha() and line[:1].isupper()
+
+def split_passages(text):
+    """
+    Return a list of (passage id, passage text) pairs. A passage
+    starts at a line range such as '1.1-209', together with the
+    author line directly above it if there is one; its id is
+    the most recent author and the range, e.g. 'Vergil 1.1-209'.
+    Text before the first header becomes a passage of its own.
+    """
+
+    lines = text.splitlines(keepends=True)
+
+    starts = []
+    for i, line in enumerate(lines):
+        if PASSAGE_HEADER.match(line):
+            if i > 0 and is_author_line(lines[i - 1]):
+                starts.append((i - 1, i))
+            else:
+                starts.append((i, i))
+    if not starts or starts[0][0] > 0:
+        starts.insert(0, (0, None))
+
+    passages = []
+    seen = Counter()
+    author = ''
+    for n, (start, header) in enumerate(starts):
+        end = starts[n + 1][0] if n + 1 < len(starts) else len(lines)
+        passage = ''.join(lines[start:end])
+        if header is None:
+            if not passage.strip():
+                continue
+            passage_id = 'front matter'
+        else:
+            if start < header:
+                author = lines[start].strip().lstrip('\ufeff')
+            passage_id = f"{author} {lines[header].strip()}".strip()
+
+        seen[passage_id] += 1
+        if seen[passage_id] > 1:
+            passage_id = f"{passage_id} #{seen[passage_id]}"
+        passages.append((passage_id, passage))
+
+    return passages
+
+def count_passage(text,enclitics=('que',),profile=False):
+    """
+    Return a Counter of the word forms of one passage and, if
+    profile is True, the report of a Profiler for the passage
+    """
+
+    profiler = Profiler() if profile else NULL_PROFILER
+    with profiler.stage('sentence tokenization'):
+        sentences = get_normalizer().sentences(text)
+    word_forms = count_word_forms(sentences, enclitics, profiler)
+    return word_forms, profiler.report() if profile else None
+
+class PassageCache:
+    """
+
+    PassageCache compiles a text passage by passage and keeps
+    each passage's word form counts on disk, under a hash of
+    the passage and the settings used. On the next run only
+    passages whose hash has changed are processed again before
+    all the counts are merged.
+
+    Sentences are tokenized within their passage, so a sentence
+    that runs on across a passage header is split there; apart
+    from that the counts are those of compile_lemmata.
+
+    ...
+
+    Attributes
+    ----------
+    cache_dir : str
+        where the per-passage counts are kept
+
+    enclitics : tuple
+        the enclitics split off, as for compile_lemmata
+
+    hits : int
+        passages read from the cache
+
+    misses : int
+        passages that had to be processed
+
+    Methods
+    -------
+    compile(filename, workers, profiler)
+        Returns a Counter of the word forms of the file
+
+    passage_key(text)
+        Returns the hash a passage is cached under
+
+    """
+
+    def __init__(self,cache_dir='.passage_cache',enclitics=('que',)):
+        self.cache_dir = cache_dir
+        self.enclitics = tuple(enclitics)
+        self.hits = 0
+        self.misses = 0
+
+    def passage_key(self,text):
+        """ Return the hash a passage is cached under """
+
+        digest = hashlib.sha256()
+        digest.update(f"{CACHE_VERSION}|{','.join(self.enclitics)}|".encode('utf-8'))
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self,key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load(self,key):
+        """ Return the cached counts for key, or None """
+
+        try:
+            with open(self._path(key)) as f:
+                return Counter(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def _store(self,key,counts):
+        """ Write counts for key, renaming into place when done """
+
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(counts, f, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    def compile(self,filename,workers=1,profiler=NULL_PROFILER):
+        """
+        Return a Counter of word forms, reusing cached passages;
+        a Profiler times the cache and the passages processed
+        """
+
+        with open(f"./{filename}", "r") as myfile:
+            passages = split_passages(myfile.read())
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        keys = [self.passage_key(text) for passage_id, text in passages]
+        cached = {}
+        changed = {}
+        with profiler.stage('passage cache reads'):
+            for key, (passage_id, text) in zip(keys, passages):
+                if key in cached or key in changed:
+                    continue
+                counts = self._load(key)
+                if counts is None:
+                    changed[key] = text
+                else:
+                    self.hits += 1
+                    cached[key] = counts
+
+        self.misses += len(changed)
+        profiler.count_cache('passages', len(cached), len(changed))
+        texts = list(changed.values())
+        enclitics = [self.enclitics] * len(texts)
+        profile = [profiler.enabled] * len(texts)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(texts) < 2:
+            results = list(map(count_passage, texts, enclitics, profile))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(count_passage, texts, enclitics, profile))
+
+        with profiler.stage('passage cache writes'):
+            for key, (counts, report) in zip(changed, results):
+                self._store(key, counts)
+                cached[key] = counts
+        for counts, report in results:
+            if report is not None:
+                profiler.merge(report)
+
+        unique_word_forms = Counter()
+        for key in keys:
+            unique_word_forms.update(cached[key])
+
+        return unique_word_forms
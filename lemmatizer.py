@@ -0,0 +1,162 @@
+from functools import lru_cache
+
+from cache import BoundedCache
+from lexicon import Lexicon
+from tokenizer import fold_macrons
+
+LEXICONS = ('ap_lemmata.csv', 'ap_pos.csv')
+
+class Lemmatizer:
+    """
+
+    Lemmatizer looks a word up in tiers. The hand-curated
+    lexicons are read into an in-memory dict of form to lemmata
+    first; only a form that is not there is sent to cltk's
+    backoff lemmatizer, and its answer is kept in a bounded
+    cache so that each unknown form is lemmatized once.
+
+    ...
+
+    Attributes
+    ----------
+    forms : dict
+        word form -> tuple of lemmata from the lexicons
+
+    folded : dict
+        the same with macrons folded out of the word forms,
+        for texts printed without them
+
+    cache : BoundedCache
+        cltk's lemmata for forms missing from the lexicons
+
+    lexicon_hits : int
+        lookups answered by the lexicons
+
+    lexicon_misses : int
+        lookups the lexicons could not answer
+
+    fallbacks : int
+        forms sent to cltk's lemmatizer
+
+    Methods
+    -------
+    get(form, default)
+        Returns the lexicons' lemmata for a form, with or
+        without its macrons, or default
+
+    lemmatize(form)
+        Returns a tuple of possible lemmata
+
+    lemmatize_many(forms)
+        Returns a list of tuples of lemmata, sending every
+        unknown form to cltk in one call
+
+    stats()
+        Returns a dict of hit and miss counters
+
+    """
+
+    def __init__(self,lexicons=LEXICONS,cache_size=65536):
+        self.forms = {}
+        self.folded = {}
+        for csv_path in lexicons:
+            with Lexicon.open(csv_path) as lexicon:
+                for entry in lexicon:
+                    for forms, form in ((self.forms, entry.word),
+                            (self.folded, fold_macrons(entry.word))):
+                        lemmata = forms.get(form, ())
+                        if entry.lemma not in lemmata:
+                            forms[form] = lemmata + (entry.lemma,)
+
+        self.cache = BoundedCache(cache_size)
+        self.lexicon_hits = 0
+        self.lexicon_misses = 0
+        self.fallbacks = 0
+        self._backoff = None
+
+    def get(self,form,default=None):
+        """ Return the lexicons' lemmata for form, or default """
+
+        lemmata = self.forms.get(form)
+        if lemmata is None:
+            lemmata = self.folded.get(fold_macrons(form))
+        if lemmata is None:
+            self.lexicon_misses += 1
+            return default
+        self.lexicon_hits += 1
+        return lemmata
+
+    def _from_lexicon(self,form):
+        """
+        Return the lexicon's lemmata for form, or None; an exact
+        match is preferred to one that ignores macrons
+        """
+
+        lemmata = self.forms.get(form)
+        if lemmata is None and not form.islower():
+            form = form.lower()
+            lemmata = self.forms.get(form)
+        if lemmata is None:
+            lemmata = self.folded.get(fold_macrons(form))
+        if lemmata is not None:
+            self.lexicon_hits += 1
+        else:
+            self.lexicon_misses += 1
+        return lemmata
+
+    def _fall_back(self,forms):
+        """ Return cltk's lemma for each form, caching the answers """
+
+        if self._backoff is None:
+            from cltk.lemmatize.latin.backoff import BackoffLatinLemmatizer
+            self._backoff = BackoffLatinLemmatizer()
+
+        self.fallbacks += len(forms)
+        lemmata = {}
+        for form, (token, lemma) in zip(forms, self._backoff.lemmatize(list(forms))):
+            lemmata[form] = (lemma,) if lemma else ()
+            self.cache.put(form, lemmata[form])
+        return lemmata
+
+    def lemmatize(self,form):
+        """ Return a tuple of the possible lemmata of form """
+
+        return self.lemmatize_many([form])[0]
+
+    def lemmatize_many(self,forms):
+        """ Return a tuple of possible lemmata for each form """
+
+        results = {}
+        missing = []
+        for form in forms:
+            if form in results:
+                continue
+            lemmata = self._from_lexicon(form)
+            if lemmata is None:
+                lemmata = self.cache.get(form)
+            if lemmata is None:
+                missing.append(form)
+            results[form] = lemmata
+
+        if missing:
+            results.update(self._fall_back(missing))
+
+        return [results[form] or () for form in forms]
+
+    def stats(self):
+        """ Return a dict of the lemmatizer's hit and miss counters """
+
+        return {
+                'lexicon_hits': self.lexicon_hits,
+                'lexicon_misses': self.lexicon_misses,
+                'cache_hits': self.cache.hits,
+                'cache_misses': self.cache.misses,
+                'fallbacks': self.fallbacks,
+                'cache_size': len(self.cache),
+                }
+
+@lru_cache(maxsize=None)
+def get_lemmatizer():
+    """ Return a shared Lemmatizer, building it on first use """
+
+    return Lemmatizer()
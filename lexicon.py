@@ -0,0 +1,303 @@
+from array import array
+from collections import namedtuple
+import argparse
+import csv
+import mmap
+import os
+import struct
+
+from tokenizer import fold_macrons
+
+LexiconEntry = namedtuple('LexiconEntry', ['count', 'word', 'stem', 'lemma', 'pos'])
+
+MAGIC = b'LATLEX\x00\x02'
+# magic, source mtime (ns), source size, strings, blob bytes, pos tags, rows
+HEADER = struct.Struct('<8sqqIIII')
+# the indexed columns; 'folded' is the word without macrons
+COLUMNS = ('word', 'stem', 'lemma', 'folded')
+ROW_WIDTH = 5
+
+def read_lexicon_csv(filename):
+    """
+    Return a list of (count, word, stem, lemma, pos) rows from
+    ap_lemmata.csv or ap_pos.csv; a header row is skipped and
+    a missing pos is returned as ''.
+    """
+
+    rows = []
+    with open(filename, newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0] == 'count':
+                continue
+            count, word, stem, lemma = row[:4]
+            pos = row[4] if len(row) > 4 else ''
+            rows.append((int(count), word, stem, lemma, pos))
+    return rows
+
+def _pad(data):
+    """ Return data padded with zero bytes to a multiple of four """
+
+    return data + b'\x00' * (-len(data) % 4)
+
+def compile_lexicon(csv_path,binary_path):
+    """
+    Compile a lexicon csv into the binary format read by
+    Lexicon. All strings are interned and sorted, so string
+    ids compare in the same order as the strings themselves;
+    parts of speech are stored as small integer codes. Each
+    word's macron-folded spelling is interned and indexed as
+    well, so that texts without macrons can be looked up
+    without folding the lexicon at query time. The file is
+    written beside the target and renamed into place
+    so that readers never see a half written file.
+    """
+
+    rows = read_lexicon_csv(csv_path)
+    source = os.stat(csv_path)
+
+    pos_tags = sorted({row[4] for row in rows} | {''})
+    folded = [fold_macrons(row[1]) for row in rows]
+    strings = sorted({text for row in rows for text in row[1:]} | set(folded) | {''},
+            key=lambda text: text.encode('utf-8'))
+    string_ids = {text: i for i, text in enumerate(strings)}
+    pos_codes = {tag: i for i, tag in enumerate(pos_tags)}
+
+    offsets = array('I', [0])
+    blob = bytearray()
+    for text in strings:
+        blob += text.encode('utf-8')
+        offsets.append(len(blob))
+
+    table = array('I')
+    for count, word, stem, lemma, pos in rows:
+        table.extend((count, string_ids[word], string_ids[stem],
+                string_ids[lemma], pos_codes[pos]))
+
+    sections = [offsets.tobytes(), _pad(bytes(blob)),
+            array('I', [string_ids[tag] for tag in pos_tags]).tobytes(),
+            table.tobytes()]
+
+    # one compressed row index per column: rows[starts[s]:starts[s + 1]]
+    # are the rows whose column holds string s
+    keys = [table[column::ROW_WIDTH] for column in range(1, 4)]
+    keys.append([string_ids[text] for text in folded])
+    for column in keys:
+        order = sorted(range(len(rows)), key=column.__getitem__)
+        starts = array('I', [0] * (len(strings) + 1))
+        for row in order:
+            starts[column[row] + 1] += 1
+        for i in range(len(strings)):
+            starts[i + 1] += starts[i]
+        sections += [starts.tobytes(), array('I', order).tobytes()]
+
+    header = HEADER.pack(MAGIC, source.st_mtime_ns, source.st_size,
+            len(strings), len(blob), len(pos_tags), len(rows))
+
+    temporary = f"{binary_path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+    os.replace(temporary, binary_path)
+
+def is_stale(csv_path,binary_path):
+    """ Return True if the binary lexicon is missing or out of date """
+
+    try:
+        with open(binary_path, 'rb') as f:
+            magic, mtime, size = HEADER.unpack(f.read(HEADER.size))[:3]
+    except (OSError, struct.error):
+        return True
+
+    source = os.stat(csv_path)
+    return (magic != MAGIC or mtime != source.st_mtime_ns
+            or size != source.st_size)
+
+class Lexicon:
+    """
+
+    Lexicon reads a compiled lexicon through a read-only
+    memory map, so every process that opens the same file
+    shares one copy of it in memory. Words, stems and lemmata
+    are found by binary search over the interned strings and
+    then read straight out of the row index for that column.
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        the compiled lexicon file
+
+    pos_tags : tuple
+        the parts of speech; a row's pos code indexes this
+
+    Methods
+    -------
+    open(csv_path, binary_path)
+        Returns a Lexicon for the csv, compiling it first if
+        the binary file is missing or older than the csv
+
+    by_word(word), by_stem(stem), by_lemma(lemma)
+        Return a list of LexiconEntry rows
+
+    by_folded(word)
+        Returns the rows whose word matches once macrons
+        are folded on both sides, e.g. 'cano' finds 'canō'
+
+    entry(row)
+        Returns the LexiconEntry at a row number
+
+    close()
+        Releases the memory map
+
+    """
+
+    def __init__(self,path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, self.source_mtime, self.source_size, n_strings, blob_size,
+                n_pos, n_rows) = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled lexicon")
+
+        # every view of the map is kept so close() can release it
+        self._views = [memoryview(self._map)]
+        position = HEADER.size
+
+        def take(count, cast=True):
+            nonlocal position
+            size = count * 4 if cast else count + (-count % 4)
+            section = self._views[0][position:position + size]
+            position += size
+            self._views.append(section)
+            if cast:
+                section = section.cast('I')
+                self._views.append(section)
+            return section
+
+        self._offsets = take(n_strings + 1)
+        self._blob = take(blob_size, cast=False)
+        pos_ids = take(n_pos)
+        self._rows = take(n_rows * ROW_WIDTH)
+        self._index = {}
+        for column in COLUMNS:
+            self._index[column] = (take(n_strings + 1), take(n_rows))
+
+        self._length = n_rows
+        self._n_strings = n_strings
+        self.pos_tags = tuple(self.string(i) for i in pos_ids)
+
+    @classmethod
+    def open(cls,csv_path,binary_path=None):
+        """ Return a Lexicon for csv_path, compiling it if stale """
+
+        binary_path = binary_path or os.path.splitext(csv_path)[0] + '.lex'
+        if is_stale(csv_path, binary_path):
+            compile_lexicon(csv_path, binary_path)
+        return cls(binary_path)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return (self.entry(row) for row in range(self._length))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc_info):
+        self.close()
+
+    def close(self):
+        """ Release the memory map """
+
+        self._offsets = self._blob = self._rows = self._index = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def string(self,string_id):
+        """ Return the interned string with the given id """
+
+        start, end = self._offsets[string_id], self._offsets[string_id + 1]
+        return str(self._blob[start:end], 'utf-8')
+
+    def string_id(self,text):
+        """ Return the id of an interned string, or None """
+
+        key = text.encode('utf-8')
+        blob, offsets = self._blob, self._offsets
+        low, high = 0, self._n_strings
+        while low < high:
+            middle = (low + high) // 2
+            if blob[offsets[middle]:offsets[middle + 1]].tobytes() < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._n_strings and blob[offsets[low]:offsets[low + 1]].tobytes() == key:
+            return low
+        return None
+
+    def entry(self,row):
+        """ Return the LexiconEntry at a row number """
+
+        base = row * ROW_WIDTH
+        count, word, stem, lemma, pos = self._rows[base:base + ROW_WIDTH]
+        return LexiconEntry(count, self.string(word), self.string(stem),
+                self.string(lemma), self.pos_tags[pos])
+
+    def _lookup(self,column,text):
+        """ Return the entries whose column holds text """
+
+        string_id = self.string_id(text)
+        if string_id is None:
+            return []
+        starts, rows = self._index[column]
+        return [self.entry(row) for row in
+                rows[starts[string_id]:starts[string_id + 1]]]
+
+    def by_word(self,word):
+        """ Return the entries for a word form """
+
+        return self._lookup('word', word)
+
+    def by_stem(self,stem):
+        """ Return the entries sharing a stem """
+
+        return self._lookup('stem', stem)
+
+    def by_lemma(self,lemma):
+        """ Return the entries for a lemma """
+
+        return self._lookup('lemma', lemma)
+
+    def by_folded(self,word):
+        """ Return the entries for a word form, ignoring macrons """
+
+        return self._lookup('folded', fold_macrons(word))
+
+def main(argv=None):
+    """ Compile the given lexicon csv files """
+
+    parser = argparse.ArgumentParser(description=
+            "Compile lexicon csv files into memory-mapped binary lexicons")
+    parser.add_argument("lexicons", nargs="*",
+            default=["ap_lemmata.csv", "ap_pos.csv"], help="csv files to compile")
+    parser.add_argument("--force", action="store_true",
+            help="rebuild even if the binary file is up to date")
+    args = parser.parse_args(argv)
+
+    for csv_path in args.lexicons:
+        binary_path = os.path.splitext(csv_path)[0] + '.lex'
+        if args.force or is_stale(csv_path, binary_path):
+            compile_lexicon(csv_path, binary_path)
+        with Lexicon(binary_path) as lexicon:
+            print(f"{binary_path}: {len(lexicon)} rows, "
+                    f"{len(lexicon.pos_tags)} parts of speech")
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,29 @@
-from cltk.stem.latin.syllabifier import Syllabifier
+from functools import lru_cache
+import argparse
+
+# cltk's Syllabifier is imported on first use so that importing this
+# module stays cheap
+
+SHORT_VOWELS = frozenset(['a','e','i','o','u','y'])
+LONG_VOWELS = frozenset(['ā','ē','ī','ō','ū','ӯ'])
+ALL_VOWELS = SHORT_VOWELS | LONG_VOWELS
+STOPS = frozenset(['p','b','t','d','c','g','k'])
+DENTALS = frozenset(['t','d'])
+VELARS = frozenset(['c','g','k'])
+
+SHORTEN = dict(zip(['ā','ē','ī','ō','ū','ӯ'], ['a','e','i','o','u','y']))
+LENGTHEN = {short: long for long, short in SHORTEN.items()}
+
+@lru_cache(maxsize=None)
+def get_syllabifier():
+    """ Return a shared cltk Syllabifier, building it on first use """
+    from cltk.stem.latin.syllabifier import Syllabifier
+    return Syllabifier()
+
+@lru_cache(maxsize=16384)
+def syllabify(stem):
+    """ Return the syllables of a stem as a tuple; results are cached """
+    return tuple(get_syllabifier().syllabify(stem))
 
 class Stem:
     """
@@ -25,22 +50,24 @@ class Stem:
         that vowels long by nature will be marked with
         macrons.
 
-    short_vowels : list
-        a list of short vowels
+    short_vowels : frozenset
+        the short vowels; this and the sets below are shared
+        by every stem rather than built for each one
 
-    long_vowels : a list of long vowels
+    long_vowels : frozenset
+        the long vowels
 
     diphthongs : list
         not yet implemented; not sure how to deal with digraphs
 
-    stops : list
-        a list of consonants representing stops
+    stops : frozenset
+        the consonants representing stops
 
-    dentals : list
-        a list of dental stops
+    dentals : frozenset
+        the dental stops
 
-    velars : list
-        a list of velar stops
+    velars : frozenset
+        the velar stops
 
     Methods
     -------
@@ -52,6 +79,11 @@ class Stem:
         given a short vowel, returns the equivalent long
         vowel
 
+    syllables()
+        returns the stem's syllables as a tuple; rules that
+        need syllable weight should use this rather than
+        building their own Syllabifier
+
     rhotacism()
         used when adding a vowel to the stem to determine
         whether an [s] should evolve into an [r]
@@ -61,6 +93,11 @@ class Stem:
         will weaken preceding short vowels; has not been
         checked against diphthongs yet (2020.04.22)
 
+    affix(ending)
+        adds one of the endings of SOUND_CHANGES to the stem;
+        the add_ methods below each call this, so that their
+        rules are rows of that table rather than code
+
     add_s()
         adds [s] to the stem withe all the linguistic
         repercussions entailed
@@ -93,29 +130,43 @@ class Stem:
         primarily seen in 1st and 2nd declension dative/ablative
         plurals; eventually overwhelms the stem vowel as [īs]
 
+    add_es()
+        the 3rd, 4th and 5th declension nominative plural;
+        accounts for rhotacism, lenition and vowel stems
+
+    add_um()
+        the 3rd and 4th declension genitive plural; [i] and
+        [u] stems keep their vowel
+
     add_ibus()
         adds this sound to the stem, checking for final sounds,
         whether they are long/short vowels, or consonants, and
         adjusting the stem accordingly
 
     """
+    __slots__ = ('stem',)
+
+    short_vowels = SHORT_VOWELS
+    long_vowels = LONG_VOWELS
+    all_vowels = ALL_VOWELS
+    stops = STOPS
+    dentals = DENTALS
+    velars = VELARS
+
     def __init__(self,stem):
         self.stem = stem
 
-        self.short_vowels = ['a','e','i','o','u','y']
-        self.long_vowels = ['ā','ē','ī','ō','ū','ӯ']
-        self.all_vowels = self.short_vowels + self.long_vowels
-        self.stops = ['p','b','t','d','c','g','k']
-        self.dentals = ['t','d']
-        self.velars = ['c','g','k']
-
     def shorten_vowel(self,vowel):
         """ Return the shortened value of the given long vowel """
-        return self.short_vowels[self.long_vowels.index(vowel)]
+        return SHORTEN[vowel]
 
     def lengthen_vowel(self,vowel):
         """ Return the lengthened value of the given short vowel """
-        return self.long_vowels[self.short_vowels.index(vowel)]
+        return LENGTHEN[vowel]
+
+    def syllables(self):
+        """ Return the syllables of the stem, from a shared cache """
+        return syllabify(self.stem)
 
     def vowel_weakening(self,rhotacized):
         """
@@ -153,142 +204,71 @@ class Stem:
         else:
             return self.stem
 
+    def affix(self,ending):
+        """ Return the stem with an ending of SOUND_CHANGES added """
+        stem = self.stem
+        dispatch, default = COMPILED_SOUND_CHANGES[ending]
+        for conditions, drop, change, addition in dispatch.get(stem[-1], default):
+            for position, letters, negated in conditions:
+                if (stem[position] in letters) is negated:
+                    break
+            else:
+                kept = stem[:len(stem) - drop]
+                if change is None:
+                    return kept + addition
+                elif isinstance(change, dict):
+                    return kept + change[stem[-drop]] + addition
+                new_stem = change(stem)
+                return new_stem if new_stem is None else new_stem + addition
+
     def add_s(self):
         """
         Adds [s] to the stem and accounts for the various
         irregularities among nouns, not pronouns, as of
         2020.04.22.
         """
-        if self.stem[-1] in self.dentals:
-            return self.stem[:-1] + "s"
-        elif self.stem[-1] == 'r':
-            if self.stem[-2] in self.long_vowels:
-                return self.stem[:-2] + self.shorten_vowel(self.stem[-2]) + 'r'
-            else:
-                return self.stem
-        elif self.stem[-1] == 'n':
-            if self.stem[-2] == 'e':
-                return self.stem
-            elif self.stem[-2] in self.short_vowels:
-                return self.stem[:-2] + self.lengthen_vowel(self.stem[-2])
-            else:
-                return self.stem[:-1]
-        elif self.stem[-1] in self.velars:
-            return self.stem[:-1] + 'x'
-        elif self.stem[-1] == "e":
-            return self.stem[:-1] + "ēs"
-        elif self.stem[-1] == 's':
-            return self.stem
-        elif self.stem[-1] != 'o':
-            return self.stem + "s"
-        else:
-            if self.stem[-2] != 'r':
-                return self.stem[:-1] + 'us'
-            elif self.stem[-3] not in self.all_vowels:
-                return self.stem[:-2] + 'er'
-            else:
-                syllabifier = Syllabifier()
-                syllables = syllabifier.syllabify(self.stem)
-                if len(syllables) != 3:
-                    if self.stem == 'uiro':
-                        return 'uir'
-                    else:
-                        return self.stem[:-1] + 'us'
-                else:
-                    if syllables[-2][-1] in self.short_vowels:
-                        return self.stem[:-1]
-
+        return self.affix('s')
 
     def add_m(self):
         """ Assumes this is a word final [m] and adds to stem """
-        if self.stem[-1] == "o":
-            return self.stem[:-1] + "um"
-        elif self.stem[-1] == 'i':
-            return self.stem[:-1] + 'em'
-        elif self.stem[-1] in self.short_vowels and self.stem != 'i':
-            return self.stem + 'm'
-        elif self.stem[-1] in self.long_vowels:
-            short_vowel = self.shorten_vowel(self.stem[-1])
-            return  self.stem[:-1] + short_vowel + 'm'
-        else:
-            new_stem = self.rhotacism()
-            new_stem = self.vowel_weakening(new_stem)
-            return new_stem + 'em'
+        return self.affix('m')
 
     def add_ei(self):
         """ 
         the [ei] is Old Latin which in Classical Latin is
         most often represented as [ī] when not combined. Some
         pragmatic and not strictly historically linguistic
-        rules have been imposed below.
+        rules have been imposed in SOUND_CHANGES.
         """
-        if self.stem[-1] == 'a':
-            return self.stem + 'e'
-        elif self.stem[-1] == 'o':
-            return self.stem[:-1] + "ī"
-        elif self.stem[-1] in self.short_vowels:
-            return self.stem + "ī"
-        elif self.stem[-1] in self.long_vowels:
-            if self.stem[-1] == "ē":
-                if self.stem[-2] in self.all_vowels:
-                    return self.stem + "ī"
-                else:
-                    short_vowel = self.shorten_vowel(self.stem[-1])
-                    return self.stem[:-1] + short_vowel + "ī"
-            else:
-                short_vowel = self.shorten_vowel(self.stem[-1])
-                return self.stem[:-1] + short_vowel + "ī"
-        else:
-            new_stem = self.rhotacism()
-            new_stem = self.vowel_weakening(new_stem)
-            return new_stem + "ī"
+        return self.affix('ei')
 
     def add_ns(self):
         """ lose the [n] and see compensatory lengthening """
-        if self.stem[-1] in self.short_vowels:
-            long_vowel = self.lengthen_vowel(self.stem[-1])
-            return self.stem[:-1] + long_vowel + "s"
-        elif self.stem[-1] in self.long_vowels:
-            return self.stem + "s"
-        else:
-            new_stem = self.rhotacism()
-            new_stem = self.vowel_weakening(new_stem)
-            return new_stem + "ēs"
+        return self.affix('ns')
 
     def add_sum(self):
         """ rhotacism of [s] """
-        if self.stem in self.short_vowels:
-            long_vowel = self.lengthen_vowel(self.stem[-1])
-            return self.stem[:-1] + long_vowel + "rum"
-        else:
-            return self.stem + "rum"
+        return self.affix('sum')
 
     def add_e(self):
         """ check for rhotacism and vowel lenition, then add [e] """
-        new_stem = self.rhotacism()
-        new_stem = self.vowel_weakening(new_stem)
-        return new_stem + "e"
+        return self.affix('e')
 
     def add_is(self):
         """ check for rhotacism and lenition; assimilate and add [e] """
-        if self.stem[-1] == 'u':
-            return self.stem[:-1] + 'ūs'
-        elif self.stem[-1] in self.short_vowels:
-            return self.stem[:-1] + 'is'
-        else:
-            new_stem = self.rhotacism()
-            new_stem = self.vowel_weakening(new_stem)
-            return new_stem + "is"
+        return self.affix('is')
 
     def add_eis(self):
         """ gobble up final vowel of stem and add [īs] """
-        return self.stem[:-1] + 'īs'
+        return self.affix('eis')
 
     def add_es(self):
-        pass
+        """ the plural [ēs]; vowel stems lengthen or absorb it """
+        return self.affix('es')
 
     def add_um(self):
-        pass
+        """ vowel stems keep their vowel; otherwise as add_e() """
+        return self.affix('um')
 
     def add_ibus(self):
         """ 
@@ -297,16 +277,172 @@ class Stem:
         in the 4th declension; if consonant then does 
         rhotacism check and lenition check.
         """
-        if self.stem[-1] in self.long_vowels:
-            return self.stem + "bus"
-        elif self.stem[-1] == 'a':
-            return self.stem[:-1] + "ābus"
-        elif self.stem[-1] in self.short_vowels:
-            return self.stem[:-1] + "ibus"
+        return self.affix('ibus')
+
+@lru_cache(maxsize=16384)
+def oblique_stem(stem):
+    """ Return the stem after rhotacism and vowel weakening; cached """
+    stem = Stem(stem)
+    return stem.vowel_weakening(stem.rhotacism())
+
+def _ro_nominative(stem):
+    """ the nominative of a 2nd declension -ro stem after a vowel """
+    syllables = syllabify(stem)
+    if len(syllables) != 3:
+        if stem == 'uiro':
+            return 'uir'
         else:
-            new_stem = self.rhotacism()
-            new_stem = self.vowel_weakening(new_stem)
-            return new_stem + "ibus"
+            return stem[:-1] + 'us'
+    elif syllables[-2][-1] in SHORT_VOWELS:
+        return stem[:-1]
+
+# letters that stand for a class of sounds in a SOUND_CHANGES pattern
+PATTERN_CLASSES = {
+        'V' : ALL_VOWELS,
+        'S' : SHORT_VOWELS,
+        'L' : LONG_VOWELS,
+        'D' : DENTALS,
+        'K' : VELARS,
+        }
+
+SOUND_CHANGES_BY_NAME = {
+        'shorten' : SHORTEN,
+        'lengthen' : LENGTHEN,
+        'oblique' : oblique_stem,
+        'ro' : _ro_nominative,
+        }
+
+# ending : [(stem-final pattern, letters dropped, change, letters added)]
+#
+# A pattern is read against the end of the stem, one symbol per
+# letter: a letter matches itself, V S L D K match the classes in
+# PATTERN_CLASSES, '.' matches anything and '!' negates the symbol
+# after it. The first pattern that matches wins. The change, if
+# any, is applied to the first dropped letter ('shorten' or
+# 'lengthen') or to the whole stem ('oblique', 'ro').
+SOUND_CHANGES = {
+        's' : [
+            ('D', 1, None, 's'),
+            ('Lr', 2, 'shorten', 'r'),
+            ('r', 0, None, ''),
+            ('en', 0, None, ''),
+            ('Sn', 2, 'lengthen', ''),
+            ('n', 1, None, ''),
+            ('K', 1, None, 'x'),
+            ('e', 1, None, 'ēs'),
+            ('s', 0, None, ''),
+            ('!o', 0, None, 's'),
+            ('!ro', 1, None, 'us'),
+            ('!Vro', 2, None, 'er'),
+            ('ro', 0, 'ro', ''),
+            ],
+        'm' : [
+            ('o', 1, None, 'um'),
+            ('i', 1, None, 'em'),
+            ('S', 0, None, 'm'),
+            ('L', 1, 'shorten', 'm'),
+            ('.', 0, 'oblique', 'em'),
+            ],
+        'ei' : [
+            ('a', 0, None, 'e'),
+            ('o', 1, None, 'ī'),
+            ('S', 0, None, 'ī'),
+            ('Vē', 0, None, 'ī'),
+            ('L', 1, 'shorten', 'ī'),
+            ('.', 0, 'oblique', 'ī'),
+            ],
+        'ns' : [
+            ('S', 1, 'lengthen', 's'),
+            ('L', 0, None, 's'),
+            ('.', 0, 'oblique', 'ēs'),
+            ],
+        'sum' : [
+            ('S', 1, 'lengthen', 'rum'),
+            ('.', 0, None, 'rum'),
+            ],
+        'e' : [
+            ('.', 0, 'oblique', 'e'),
+            ],
+        'is' : [
+            ('u', 1, None, 'ūs'),
+            ('S', 1, None, 'is'),
+            ('.', 0, 'oblique', 'is'),
+            ],
+        'eis' : [
+            ('.', 1, None, 'īs'),
+            ],
+        'es' : [
+            ('i', 1, None, 'ēs'),
+            ('S', 1, 'lengthen', 's'),
+            ('L', 0, None, 's'),
+            ('.', 0, 'oblique', 'ēs'),
+            ],
+        'um' : [
+            ('V', 0, None, 'um'),
+            ('.', 0, 'oblique', 'um'),
+            ],
+        'ibus' : [
+            ('L', 0, None, 'bus'),
+            ('a', 1, None, 'ābus'),
+            ('S', 1, None, 'ibus'),
+            ('.', 0, 'oblique', 'ibus'),
+            ],
+        }
+
+def _parse_pattern(pattern):
+    """
+    return a pattern as a list of (position, letters, negated),
+    position counting back from the end of the stem; '.' gives
+    letters of None
+    """
+    symbols = []
+    negated = False
+    for symbol in pattern:
+        if symbol == '!':
+            negated = True
+            continue
+        letters = None if symbol == '.' else PATTERN_CLASSES.get(symbol, frozenset(symbol))
+        symbols.append((letters, negated))
+        negated = False
+    return [(position - len(symbols), letters, negated)
+            for position, (letters, negated) in enumerate(symbols)]
+
+def compile_sound_changes(table):
+    """
+    Compile a table like SOUND_CHANGES into, for each ending, a
+    dict of final letter -> rules that can apply to a stem
+    ending in it, and the rules for any other final letter.
+    Each rule keeps only the conditions on the letters before
+    the final one, so applying an ending is one dict lookup and,
+    almost always, one rewrite.
+    """
+    compiled = {}
+    for ending, rows in table.items():
+        rules = []
+        for pattern, drop, change, addition in rows:
+            conditions = _parse_pattern(pattern)
+            position, final, negated = conditions.pop()
+            conditions = tuple(condition for condition in conditions
+                    if condition[1] is not None)
+            rules.append((final, negated, (conditions, drop,
+                    SOUND_CHANGES_BY_NAME.get(change), addition)))
+
+        finals = set()
+        for final, negated, rule in rules:
+            finals.update(final or ())
+
+        def applies(letter, final, negated):
+            return final is None or (letter in final) is not negated
+
+        dispatch = {letter: tuple(rule for final, negated, rule in rules
+                if applies(letter, final, negated)) for letter in finals}
+        # a letter no pattern names matches only '.' and negated symbols
+        default = tuple(rule for final, negated, rule in rules
+                if final is None or negated)
+        compiled[ending] = (dispatch, default)
+    return compiled
+
+COMPILED_SOUND_CHANGES = compile_sound_changes(SOUND_CHANGES)
 
 class Noun(Stem):
     """
@@ -336,7 +472,17 @@ class Noun(Stem):
     for the basic declensions. Woud like to eventually add
     support for determiners, pronouns, and adjectives.
 
+    paradigm()
+        returns a dict of every case and number, e.g.
+        {'nom_sg': 'fīlia', ...}; the forms are generated
+        once per (stem, gender) and then served from a cache
+
+    form(cell)
+        returns one cell of the paradigm, e.g. 'gen_pl'
+
     """
+    __slots__ = ('gender',)
+
     def __init__(self,stem,gender,irregular=False):
         super().__init__(stem)
         self.gender = gender
@@ -372,35 +518,272 @@ class Noun(Stem):
         elif self.stem[-1] == 'ē':
             return self.stem
 
-    def voc_sg(self):
+    def voc_sg(self,nom=None):
         """ return the vocative singular form of a noun """
         if self.stem[-1] != 'o':
-            return self.nom_sg()
+            return nom or self.nom_sg()
         elif self.stem[-2] == 'i':
             return self.stem[:-2] + 'ī'
         else:
-            nom = super(Noun, self).add_s()
+            nom = nom or super(Noun, self).add_s()
             if nom[-1] == 'r':
                 return nom
             else:
                 return self.stem[:-1] + 'e'
 
-first = Noun('fīlia','feminine')
-second = Noun('libro','masculine')
-third = Noun('mīlet','masculine')
-fourth = Noun("manu",'masculine')
-fifth = Noun('spē','feminine')
-sixth = Noun('cīvi','masculine')
-seventh = Noun('fīlio','masculine')
-eighth = Noun('asino','masculine')
-ninth = Noun('rēg','masculine')
-tenth = Noun('prīncep','masculine')
-eleventh = Noun('homon','masculine')
-twelfth = Noun('sermōn','masculine')
-thirteenth = Noun('sacerdōt','masculine')
-fourteenth = Noun('labōr','masculine')
-fifteenth = Noun('flāmen','masculine')
-sixteenth = Noun('hiem','feminine')
-
-words = [first,second,third,fourth,fifth,sixth,seventh,eighth,ninth,tenth,eleventh,twelfth,thirteenth,fourteenth,fifteenth,sixteenth]
-[print(word.nom_sg(), word.gen_sg(), word.dat_sg(), word.acc_sg(), word.abl_sg()) for word in words]
+    def nom_pl(self):
+        """ return the nominative plural form of a noun """
+        if self.stem[-1] == 'a':
+            return self.stem + 'e'
+        elif self.stem[-1] == 'o':
+            return self.stem[:-1] + 'ī'
+        else:
+            return super(Noun, self).add_es()
+
+    def gen_pl(self):
+        """ return the genitive plural form of a noun """
+        if self.stem[-1] in ['a','o','ē']:
+            return super(Noun, self).add_sum()
+        else:
+            return super(Noun, self).add_um()
+
+    def dat_pl(self):
+        """ return the dative plural form of a noun """
+        if self.stem[-1] in ['a','o']:
+            return super(Noun, self).add_eis()
+        else:
+            return super(Noun, self).add_ibus()
+
+    def acc_pl(self):
+        """ return the accusative plural form of a noun """
+        return super(Noun, self).add_ns()
+
+    def abl_pl(self,dat=None):
+        """ return the ablative plural form of a noun """
+        return dat or self.dat_pl()
+
+    def voc_pl(self,nom=None):
+        """ return the vocative plural form of a noun """
+        return nom or self.nom_pl()
+
+    def paradigm(self):
+        """ return a dict of every case and number of the noun """
+        return dict(zip(PARADIGM_CELLS, noun_paradigm(self.stem, self.gender)))
+
+    def form(self,cell):
+        """ return one cell of the paradigm, e.g. 'gen_pl' """
+        return noun_paradigm(self.stem, self.gender)[PARADIGM_CELLS.index(cell)]
+
+CASES = ('nom', 'gen', 'dat', 'acc', 'abl', 'voc')
+NUMBERS = ('sg', 'pl')
+PARADIGM_CELLS = tuple(f"{case}_{number}" for number in NUMBERS for case in CASES)
+
+@lru_cache(maxsize=8192)
+def noun_paradigm(stem,gender):
+    """
+    Return a tuple of the forms of a noun in PARADIGM_CELLS
+    order. Each cell's rules run once; the vocatives and the
+    ablative plural reuse the forms they are identical to.
+    """
+    noun = Noun(stem, gender)
+    nom_sg = noun.nom_sg()
+    nom_pl = noun.nom_pl()
+    dat_pl = noun.dat_pl()
+    return (
+            nom_sg, noun.gen_sg(), noun.dat_sg(), noun.acc_sg(),
+            noun.abl_sg(), noun.voc_sg(nom_sg),
+            nom_pl, noun.gen_pl(), dat_pl, noun.acc_pl(),
+            noun.abl_pl(dat_pl), noun.voc_pl(nom_pl),
+            )
+
+def stem_class(stem):
+    """
+    Return the class a stem is declined by, from its final
+    sound: 'a', 'o', 'i', 'u', 'ē', 'consonant', or 'other'
+    for short stems and rarer endings that are declined one
+    Noun at a time.
+    """
+    if len(stem) < 3:
+        return 'other'
+    elif stem[-1] in ('a','o','i','u','ē'):
+        return stem[-1]
+    elif stem[-1] not in ALL_VOWELS:
+        return 'consonant'
+    else:
+        return 'other'
+
+def _rows(*columns):
+    """ return the rows of a group from its columns of forms """
+    return list(zip(*columns))
+
+def _a_stems(stems):
+    """ 1st declension: every cell is the stem plus an ending """
+    bases = [stem[:-1] for stem in stems]
+    plurals = [stem + 'e' for stem in stems]
+    obliques = [base + 'īs' for base in bases]
+    return _rows(
+            stems, plurals, plurals, [stem + 'm' for stem in stems],
+            [base + 'ā' for base in bases], stems,
+            plurals, [base + 'ārum' for base in bases], obliques,
+            [base + 'ās' for base in bases], obliques, plurals)
+
+def _o_stems(stems):
+    """ 2nd declension; only -ro stems need add_s() one at a time """
+    bases = [stem[:-1] for stem in stems]
+    nominatives = [base + 'us' if stem[-2] != 'r' else Stem(stem).add_s()
+            for stem, base in zip(stems, bases)]
+    vocatives = [stem[:-2] + 'ī' if stem[-2] == 'i' else
+            (nom if nom[-1] == 'r' else base + 'e') if nom else None
+            for stem, base, nom in zip(stems, bases, nominatives)]
+    genitives = [base + 'ī' for base in bases]
+    obliques = [base + 'īs' for base in bases]
+    return [None if voc is None else row for voc, row in zip(vocatives, _rows(
+            nominatives, genitives, genitives, [base + 'um' for base in bases],
+            [base + 'ō' for base in bases], vocatives,
+            genitives, [base + 'ōrum' for base in bases], obliques,
+            [base + 'ōs' for base in bases], obliques, genitives))]
+
+def _i_stems(stems):
+    """ 3rd declension i-stems """
+    bases = [stem[:-1] for stem in stems]
+    nominatives = [stem + 's' for stem in stems]
+    plurals = [base + 'ēs' for base in bases]
+    obliques = [base + 'ibus' for base in bases]
+    return _rows(
+            nominatives, [base + 'is' for base in bases],
+            [stem + 'ī' for stem in stems], [base + 'em' for base in bases],
+            [base + 'ī' for base in bases], nominatives,
+            plurals, [stem + 'um' for stem in stems], obliques,
+            [base + 'īs' for base in bases], obliques, plurals)
+
+def _u_stems(stems):
+    """ 4th declension """
+    bases = [stem[:-1] for stem in stems]
+    nominatives = [stem + 's' for stem in stems]
+    plurals = [base + 'ūs' for base in bases]
+    obliques = [base + 'ibus' for base in bases]
+    return _rows(
+            nominatives, plurals, [stem + 'ī' for stem in stems],
+            [stem + 'm' for stem in stems], [base + 'ū' for base in bases],
+            nominatives,
+            plurals, [stem + 'um' for stem in stems], obliques,
+            plurals, obliques, plurals)
+
+def _e_stems(stems):
+    """ 5th declension; [ē] shortens before [ī] after a consonant """
+    nominatives = [stem + 's' for stem in stems]
+    genitives = [stem + 'ī' if stem[-2] in ALL_VOWELS else stem[:-1] + 'eī'
+            for stem in stems]
+    obliques = [stem + 'bus' for stem in stems]
+    return _rows(
+            nominatives, genitives, genitives,
+            [stem[:-1] + 'em' for stem in stems], stems, nominatives,
+            nominatives, [stem + 'rum' for stem in stems], obliques,
+            nominatives, obliques, nominatives)
+
+def _consonant_stems(stems):
+    """
+    3rd declension consonant stems: rhotacism and vowel
+    weakening give one oblique stem, which takes every ending
+    but the nominative
+    """
+    nouns = [Stem(stem) for stem in stems]
+    nominatives = [noun.add_s() for noun in nouns]
+    obliques = [noun.vowel_weakening(noun.rhotacism()) for noun in nouns]
+    plurals = [oblique + 'ēs' for oblique in obliques]
+    ablatives = [oblique + 'ibus' for oblique in obliques]
+    return _rows(
+            nominatives, [oblique + 'is' for oblique in obliques],
+            [oblique + 'ī' for oblique in obliques],
+            [oblique + 'em' for oblique in obliques],
+            [oblique + 'e' for oblique in obliques], nominatives,
+            plurals, [oblique + 'um' for oblique in obliques], ablatives,
+            plurals, ablatives, plurals)
+
+STEM_CLASS_RULES = {
+        'a' : _a_stems,
+        'o' : _o_stems,
+        'i' : _i_stems,
+        'u' : _u_stems,
+        'ē' : _e_stems,
+        'consonant' : _consonant_stems,
+        }
+
+def _single_paradigm(stem,gender):
+    """ return noun_paradigm(stem, gender), or None if it fails """
+    try:
+        return noun_paradigm(stem, gender)
+    except (IndexError, KeyError, TypeError):
+        return None
+
+def paradigm_table(stems,gender=None):
+    """
+    Return a dict of each stem and the tuple of its forms, in
+    PARADIGM_CELLS order, or None where the rules fail. Stems
+    are grouped by stem_class() and each group's endings are
+    applied to the whole group at once; the forms are those
+    Noun would give.
+    """
+    groups = {}
+    for stem in dict.fromkeys(stems):
+        groups.setdefault(stem_class(stem), []).append(stem)
+
+    table = {}
+    for name, members in groups.items():
+        rule = STEM_CLASS_RULES.get(name)
+        try:
+            rows = rule(members) if rule else None
+        except (IndexError, KeyError, TypeError):
+            rows = None
+        if rows is None:
+            # a stem the group rules cannot handle; go one at a time
+            rows = [_single_paradigm(stem, gender) for stem in members]
+        table.update(zip(members, rows))
+
+    return {stem: table[stem] for stem in dict.fromkeys(stems)}
+
+SAMPLE_NOUNS = [
+        ('fīlia','feminine'),
+        ('libro','masculine'),
+        ('mīlet','masculine'),
+        ("manu",'masculine'),
+        ('spē','feminine'),
+        ('cīvi','masculine'),
+        ('fīlio','masculine'),
+        ('asino','masculine'),
+        ('rēg','masculine'),
+        ('prīncep','masculine'),
+        ('homon','masculine'),
+        ('sermōn','masculine'),
+        ('sacerdōt','masculine'),
+        ('labōr','masculine'),
+        ('flāmen','masculine'),
+        ('hiem','feminine'),
+        ]
+
+def main(argv=None):
+    """ Print the singular forms of the given stems, or of the samples """
+
+    parser = argparse.ArgumentParser(description=
+            "Print noun forms generated from their stems")
+    parser.add_argument("stems", nargs="*",
+            help="stems to decline, e.g. mīlet; defaults to the samples")
+    parser.add_argument("-g", "--gender", default="masculine",
+            help="gender of the given stems")
+    parser.add_argument("-a", "--all", action="store_true",
+            help="print every case and number, not just the singular")
+    args = parser.parse_args(argv)
+
+    if args.stems:
+        words = [Noun(stem, args.gender) for stem in args.stems]
+    else:
+        words = [Noun(stem, gender) for stem, gender in SAMPLE_NOUNS]
+
+    for word in words:
+        if args.all:
+            print(*word.paradigm().values())
+        else:
+            print(word.nom_sg(), word.gen_sg(), word.dat_sg(), word.acc_sg(), word.abl_sg())
+
+if __name__ == '__main__':
+    main()
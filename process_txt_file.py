@@ -1,8 +1,222 @@
-from cltk.tokenize.latin.sentence import SentenceTokenizer
-from cltk.stem.latin.j_v import JVReplacer
-from cltk.tag import ner
-from unidecode import unidecode
-import csv
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+import argparse
+import json
+import os
+import sys
+
+from cache import BoundedCache
+from profiling import NULL_PROFILER, Profiler
+from tokenizer import (CONFIRMED_ENCLITICS, MACRON_TABLE, fold_macrons, split_enclitic,
+        tokenize)
+from frequency import FrequencyStore
+from writers import write_counts, write_sorted_counts
+
+# cltk and nltk are imported where they are first used so
+# that importing this module stays cheap, e.g. in worker processes
+
+class ProperNounTagger:
+    """
+
+    ProperNounTagger classifies words as proper nouns with
+    cltk's named entity recognition, but tags a whole batch
+    of words with a single call to ner.tag_ner and remembers
+    the verdict for every surface form it has seen.
+
+    The verdict for each word is the same as tagging the
+    word on its own: words that punkt would split into
+    several tokens (or none) are still tagged one at a time.
+
+    ...
+
+    Attributes
+    ----------
+    cache : BoundedCache
+        verdicts keyed by surface form
+
+    Methods
+    -------
+    tag(words)
+        Returns a list of True/False, one for each word
+
+    is_proper_noun(word)
+        Returns True or False for a single word
+
+    """
+
+    def __init__(self,cache_size=65536):
+        self.cache = BoundedCache(cache_size)
+        self._punkt = None
+
+    def _batchable(self,word):
+        """ Return True if tag_ner would see the word as one token """
+
+        if word.endswith('.'):
+            return False
+        if self._punkt is None:
+            from nltk.tokenize.punkt import PunktLanguageVars
+            self._punkt = PunktLanguageVars()
+        tokens = self._punkt.word_tokenize(word)
+        return len(tokens) == 1 and tokens[0] == word
+
+    def _tag_one(self,word):
+        """ Return the verdict of tagging a lone word """
+        from cltk.tag import ner
+
+        result = ner.tag_ner('latin', input_text=word, output_type=list)
+        return len(result) > 0 and len(result[0]) > 1
+
+    def tag(self,words):
+        """ Return a list of booleans, True for proper nouns """
+        from cltk.tag import ner
+
+        verdicts = {}
+        pending = []
+        for word in words:
+            if word in verdicts:
+                continue
+            verdict = self.cache.get(word)
+            if verdict is None:
+                verdicts[word] = None
+                pending.append(word)
+            else:
+                verdicts[word] = verdict
+
+        batch = [word for word in pending if self._batchable(word)]
+        if batch:
+            result = ner.tag_ner('latin', input_text=" ".join(batch),
+                    output_type=list)
+            # fall back to one word at a time if the tokens misalign
+            if len(result) == len(batch):
+                for word, tagged in zip(batch, result):
+                    verdicts[word] = len(tagged) > 1
+
+        for word in pending:
+            if verdicts[word] is None:
+                verdicts[word] = self._tag_one(word)
+            self.cache.put(word, verdicts[word])
+
+        return [verdicts[word] for word in words]
+
+    def is_proper_noun(self,word):
+        """ Return True if the word is a proper noun """
+
+        return self.tag([word])[0]
+
+proper_noun_tagger = ProperNounTagger()
+
+def known_forms(enclitics):
+    """
+    Return the Lemmatizer, whose forms confirm the stems of -ne
+    and -ve, if enclitics includes them, or else None
+    """
+
+    if CONFIRMED_ENCLITICS.isdisjoint(enclitics):
+        return None
+    from lemmatizer import get_lemmatizer
+    return get_lemmatizer()
+
+NON_ALPHA = ".:;!?,0123456789(){}[]*<>-+'†"
+NON_ALPHA_TABLE = dict.fromkeys(map(ord, NON_ALPHA), None)
+
+# the same replacements JVReplacer makes, as a translation table
+JV_TABLE = str.maketrans('jvJV', 'iuIU')
+
+class Normalizer:
+    """
+
+    Normalizer builds the sentence tokenizer, the J/V replacer
+    and the translation tables once, and then normalizes
+    sentences in a single translate pass: punctuation and
+    numerals are dropped, 'j' and 'v' become 'i' and 'u',
+    and, if asked, macrons are removed. Newlines are folded
+    into spaces just before, as remove_newlines() does.
+
+    ...
+
+    Attributes
+    ----------
+    remove_macrons : bool
+        whether long marks over vowels are removed
+
+    strip_final_punctuation : bool
+        whether the last character of each sentence is
+        dropped before normalizing, as compile_lemmata does
+
+    sentence_tokenizer : SentenceTokenizer
+        cltk's strict Latin sentence tokenizer
+
+    jv_replacer : JVReplacer
+        cltk's J/V replacer, for callers that want it alone
+
+    table : dict
+        the fused translation table
+
+    token_table : dict
+        the part of table that tokenize() applies to words
+
+    Methods
+    -------
+    sentences(text)
+        Returns a list of sentences from a string
+
+    tokenize(sentence, enclitics)
+        Returns the Tokens of a raw sentence, found in a
+        single scan with the compiled tokenizer
+
+    normalize(sentence)
+        Returns the normalized sentence
+
+    normalize_many(sentences)
+        Returns a list of normalized sentences
+
+    """
+
+    def __init__(self,remove_macrons=False,strip_final_punctuation=True):
+        self.remove_macrons = remove_macrons
+        self.strip_final_punctuation = strip_final_punctuation
+
+        from cltk.tokenize.latin.sentence import SentenceTokenizer
+        from cltk.stem.latin.j_v import JVReplacer
+        self.sentence_tokenizer = SentenceTokenizer(strict=True)
+        self.jv_replacer = JVReplacer()
+
+        self.token_table = dict(JV_TABLE)
+        if remove_macrons:
+            self.token_table.update(MACRON_TABLE)
+        self.table = dict(NON_ALPHA_TABLE)
+        self.table.update(self.token_table)
+
+    def sentences(self,text):
+        """ Return a list of sentences from a string """
+
+        return self.sentence_tokenizer.tokenize(text)
+
+    def normalize(self,sentence):
+        """ Return the sentence stripped, folded and J/V replaced """
+
+        if self.strip_final_punctuation:
+            sentence = sentence[:-1]
+        return " ".join(sentence.splitlines()).translate(self.table)
+
+    def tokenize(self,sentence,enclitics=()):
+        """ Return the Tokens of a raw sentence, J/V replaced """
+
+        return list(tokenize(sentence, enclitics, self.token_table,
+                known_forms(enclitics)))
+
+    def normalize_many(self,sentences):
+        """ Return a list of normalized sentences """
+
+        return list(map(self.normalize, sentences))
+
+@lru_cache(maxsize=None)
+def get_normalizer(remove_macrons=False):
+    """ Return a shared Normalizer, building it on first use """
+
+    return Normalizer(remove_macrons=remove_macrons)
 
 class TextFile:
     """
@@ -20,6 +234,13 @@ class TextFile:
     file_name : str
         the name of the file
 
+    chunk_size : int
+        roughly how many characters iter_sentences reads at
+        a time
+
+    normalizer : Normalizer
+        supplies the shared sentence tokenizer
+
     Methods
     -------
     get_work()
@@ -27,9 +248,18 @@ class TextFile:
     sentence_tokenizer()
         Returns a list of sentences from a string
 
+    iter_chunks(chunk_size)
+        Yields the file a few lines at a time
+
+    iter_sentences(chunk_size)
+        Yields sentences one at a time without reading the
+        whole file into memory
+
     """
-    def __init__(self,file_name):
+    def __init__(self,file_name,chunk_size=1 << 20,normalizer=None):
         self.file_name = file_name
+        self.chunk_size = chunk_size
+        self.normalizer = normalizer or get_normalizer()
 
     def get_work(self):
         """ Return the contents of a .txt file as a string """
@@ -44,15 +274,50 @@ class TextFile:
     def sentence_tokenizer(self):
         """ Return a list of sentences from a string """
 
-        sent_tokenizer = SentenceTokenizer(strict=True)
+        return self.normalizer.sentences(self.get_work())
+
+    def iter_chunks(self,chunk_size=None):
+        """ Yield the file in pieces of about chunk_size characters """
 
-        return sent_tokenizer.tokenize(self.get_work())
+        chunk_size = chunk_size or self.chunk_size
+
+        with open(f"./{self.file_name}", "r") as myfile:
+            while True:
+                # finish the current line so no word is cut in two
+                chunk = myfile.read(chunk_size) + myfile.readline()
+                if not chunk:
+                    break
+                yield chunk
+
+    def iter_sentences(self,chunk_size=None):
+        """
+        Yield sentences one at a time. Each chunk is tokenized
+        together with whatever was left over from the previous
+        chunk; the last sentence of a chunk may be incomplete
+        and so it is carried over rather than yielded. Memory
+        is bounded by the chunk size and the longest sentence.
+        """
+
+        carry = ''
+
+        for chunk in self.iter_chunks(chunk_size):
+            text = carry + chunk
+            sentences = self.normalizer.sentences(text)
+            if not sentences:
+                carry = text
+                continue
+            yield from sentences[:-1]
+            start = text.rfind(sentences[-1])
+            carry = text[start:] if start >= 0 else sentences[-1]
+
+        if carry.strip():
+            yield from self.normalizer.sentences(carry)
 
 class Sentence:
     """
 
-    Sentence processess a text string. using unidecode,
-    cltk's j_v standardization and some basic replacement
+    Sentence processess a text string. using a macron folding
+    table, cltk's j_v standardization and some basic replacement
     tools it removes non-alphabetical characters
 
     ...
@@ -77,18 +342,23 @@ class Sentence:
         editorial characters such as brackets and daggers.
 
     remove_macrons()
-        Using the unidecode package, returns a string where
-        long marks over vowels are removed
+        Returns a string where long marks over vowels are
+        removed, whether precomposed or combining; other
+        characters are left alone
 
     replace_j_and_v()
         Using cltk's tools, returns a string where 'j' and
         'v' are replaced by 'i' and 'u' respectively
 
     tokenize()
-        Returns a list of 'words' that may still include
-        periods; additional processing is still necessary
-        to identify enclitics, remove names, and final
-        periods
+        Returns a list of words; additional processing is
+        still necessary to identify enclitics and remove
+        names
+
+    normalize(normalizer)
+        Does the work of remove_final_punctuation(),
+        remove_newlines(), remove_non_alpha() and
+        replace_j_and_v() in one pass with a Normalizer
 
     """
 
@@ -109,25 +379,31 @@ class Sentence:
     def remove_non_alpha(self):
         """ Return a string only consisting of words """
 
-        translation_table = dict.fromkeys(map(ord, ".:;!?,0123456789(){}[]*<>-+'†"), None)
-        self.sentence = self.sentence.translate(translation_table)
+        self.sentence = self.sentence.translate(NON_ALPHA_TABLE)
         return self.sentence
 
     def remove_macrons(self):
         """ Return a string without macrons """
-        self.sentence = unidecode(self.sentence)
+        self.sentence = fold_macrons(self.sentence)
         return self.sentence
 
     def replace_j_and_v(self):
         """ Return a string where 'j' and 'v' have been replaced """
-        j = JVReplacer()
+        j = get_normalizer().jv_replacer
         self.sentence = j.replace(self.sentence)
         return self.sentence
 
     def tokenize(self):
-        """ Return a list of 'words' """
+        """ Return a list of words, without empty strings """
+
+        return [token.text for token in tokenize(self.sentence)]
 
-        return self.sentence.split(' ')
+    def normalize(self,normalizer=None):
+        """ Return the sentence after the Normalizer's single pass """
+
+        normalizer = normalizer or get_normalizer()
+        self.sentence = normalizer.normalize(self.sentence)
+        return self.sentence
 
 class Word:
     """
@@ -145,14 +421,21 @@ class Word:
     word : str
         a word, perhaps abbreviated or with enclitics
 
+    enclitic : str
+        the enclitic removed by identify_enclitic, or None
+
     Methods
     -------
     identify_proper_noun()
         returns True or False if the word is a proper noun
 
+    identify_enclitic(enclitics)
+        returns the word without any of the given enclitics
+        ('que', 'ne', 've') found in ENCLITIC_RULES, and
+        records which one was removed in self.enclitic
+
     identify_enclitic_que()
-        returns True or False if the enclitic 'que' is
-        present
+        returns the word without the enclitic 'que'
 
     lower_case()
         returns lowercase form of word
@@ -162,6 +445,7 @@ class Word:
 
     def __init__(self,word):
         self.word = word.strip()
+        self.enclitic = None
 
     def __repr__(self):
         return self.word
@@ -169,92 +453,384 @@ class Word:
     def identify_proper_noun(self):
         """ Return True if a proper noun; very flawed """
 
-        result = ner.tag_ner('latin', input_text=self.word, output_type=list)
+        return proper_noun_tagger.is_proper_noun(self.word)
 
-        if len(result) > 0:
-            if len(result[0]) > 1:
-                return True
-            else:
-                return False
+    def identify_enclitic(self,enclitics=('que',)):
+        """ Return word without an enclitic from the rule table """
+
+        self.word, self.enclitic = split_enclitic(self.word, enclitics,
+                known_forms(enclitics))
+        return self.word
 
     def identify_enclitic_que(self):
         """ Return word without enclitic 'que' """
 
-        que_words = [
-                'atque','dēnique','itaque','namque','neque',
-                'quoque','undique'
-                ]
-        base_forms = [
-                'quis','quid','cuius','cui','quō','quā','quī',
-                'quōrum','quārum','quibus','quae','quod',
-                'quōs','quās',
-                "uter","utra","utrum","utrīus","utrius","utrī",
-                "utram","utrō","utrā","utrae","utrōrum","utrārum",
-                "utrīs","utrōs","utrās",
-                "plērus","plēra","plērum","plērī","plērae","plērō",
-                "plērum","plērā","plērōrum","plērārum","plērīs",
-                "plērōs","plērās"
-                ]
-        
-        [que_words.append(word + "que") for word in base_forms]
-        [que_words.append(word + "cumque") for word in base_forms]
-
-        if len(self.word) > 3:
-            if self.word[-3:] == 'que':
-                if self.word.lower() not in que_words:
-                    self.word = self.word[:-3]
-
-        return self.word
+        return self.identify_enclitic(('que',))
 
     def lower_case(self):
         """ Return lowercase form of word """
         self.word = self.word.lower()
         return self.word
 
-def compile_lemmata(filename):
-    """ Given a .txt file, returns a list of lemmata ignoring names """
+class TokenRecord:
+    """
 
-    unique_word_forms = {}
+    TokenRecord describes one token of a text as the pipeline
+    saw it, so that results can be traced back to the text
 
-    # compile list of unique word forms
+    ...
 
-    text = TextFile(filename)
-    sentences = text.sentence_tokenizer()
-    for sentence in sentences:
-        sentence = Sentence(sentence)
-        sentence.remove_final_punctuation()
-        sentence.remove_newlines()
-        sentence.remove_non_alpha()
-#        sentence.remove_macrons()
-        sentence.replace_j_and_v()
-
-        words = sentence.tokenize()
-        for word in words:
-            word = Word(word)
-            if not word.identify_proper_noun():
-                word.lower_case()
-                form = word.identify_enclitic_que()
-                if form not in unique_word_forms:
-                    unique_word_forms.update({form : 1})
+    Attributes
+    ----------
+    passage : str
+        the passage the token is in, or ''
+
+    sentence : int
+        the sentence's position in the passage
+
+    token : int
+        the token's position in the sentence
+
+    original : str
+        the token as it is written in the text, before J/V
+        replacement, case folding and enclitics
+
+    normalized : str
+        the word form that is counted
+
+    enclitic : str
+        the enclitic split off, or None
+
+    proper : bool
+        True if the token was left out as a proper noun
+
+    """
+
+    __slots__ = ('passage', 'sentence', 'token', 'original', 'normalized',
+            'enclitic', 'proper')
+
+    def __init__(self,passage,sentence,token,original,normalized,enclitic,proper):
+        self.passage = passage
+        self.sentence = sentence
+        self.token = token
+        self.original = original
+        self.normalized = normalized
+        self.enclitic = enclitic
+        self.proper = proper
+
+    def __repr__(self):
+        return (f"TokenRecord({self.passage!r}, {self.sentence}, {self.token}, "
+                f"{self.original!r}, {self.normalized!r}, {self.enclitic!r}, "
+                f"{self.proper})")
+
+def annotate(sentences,enclitics=('que',),passage='',profiler=NULL_PROFILER):
+    """ Yield a TokenRecord for every token of raw sentences """
+
+    # get_normalizer(remove_macrons=True) would also drop macrons
+    normalizer = get_normalizer()
+
+    for sentence_index, sentence in enumerate(sentences):
+        with profiler.stage('normalization') as stage:
+            tokens = normalizer.tokenize(sentence, enclitics)
+            stage.tokens = len(tokens)
+
+        with profiler.stage('proper nouns', len(tokens)):
+            proper_nouns = proper_noun_tagger.tag([token.text for token in tokens])
+
+        with profiler.stage('enclitics', len(tokens)):
+            records = []
+            for token_index, (token, proper_noun) in enumerate(zip(tokens, proper_nouns)):
+                original = sentence[token.start:token.end]
+                if proper_noun:
+                    records.append(TokenRecord(passage, sentence_index, token_index,
+                            original, token.text, None, True))
                 else:
-                    unique_word_forms[form] += 1
+                    records.append(TokenRecord(passage, sentence_index, token_index,
+                            original, token.base.lower(), token.enclitic, False))
+
+        yield from records
+
+def cache_counts():
+    """
+    Return a dict of each cache in use and its (hits, misses):
+    the proper noun tagger's, the lemmatizer's lexicons and
+    fallback cache once it is built, and the syllable, stem
+    and paradigm caches if make_synopsis has been imported
+    """
+
+    cache = proper_noun_tagger.cache
+    counts = {'proper nouns': (cache.hits, cache.misses)}
+
+    lemmatizer = sys.modules.get('lemmatizer')
+    if lemmatizer is not None and lemmatizer.get_lemmatizer.cache_info().currsize:
+        stats = lemmatizer.get_lemmatizer().stats()
+        counts['lexicon'] = (stats['lexicon_hits'], stats['lexicon_misses'])
+        counts['lemma fallbacks'] = (stats['cache_hits'], stats['cache_misses'])
+
+    synopsis = sys.modules.get('make_synopsis')
+    if synopsis is not None:
+        for name, function in (('syllables', synopsis.syllabify),
+                ('oblique stems', synopsis.oblique_stem),
+                ('paradigms', synopsis.noun_paradigm)):
+            info = function.cache_info()
+            counts[name] = (info.hits, info.misses)
+    return counts
+
+def count_word_forms(sentences,enclitics=('que',),profiler=NULL_PROFILER):
+    """ Return a Counter of word forms in raw sentences, ignoring names """
+
+    before = cache_counts()
+
+    word_forms = Counter(record.normalized for record in
+            annotate(sentences, enclitics, profiler=profiler) if not record.proper)
+
+    # only this call's lookups, so that workers' reports add up
+    for name, (hits, misses) in cache_counts().items():
+        old_hits, old_misses = before.get(name, (0, 0))
+        profiler.count_cache(name, hits - old_hits, misses - old_misses)
+    return word_forms
+
+def count_batch(sentences,enclitics=('que',),profile=False):
+    """
+    Return a Counter of word forms for a batch of sentences and,
+    if profile is True, the report of a Profiler for the batch
+    """
+
+    profiler = Profiler() if profile else NULL_PROFILER
+    word_forms = count_word_forms(sentences, enclitics, profiler)
+    return word_forms, profiler.report() if profile else None
+
+def batches(iterable,size):
+    """ Yield lists of up to size items from iterable """
+
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def compile_lemmata(filename,enclitics=('que',),workers=1,batch_size=256,
+        profiler=NULL_PROFILER,store=None):
+    """
+    Given a .txt file, returns a dict of word forms and their
+    counts, ignoring names. With more than one worker the
+    sentences are sent in batches to a process pool and the
+    workers' counts are merged; the result is the same as a
+    serial run. workers=None uses every core. A Profiler
+    collects the time spent in each stage, including the
+    workers' stages. If a store such as a FrequencyStore is
+    given, each batch's counts are added to it as they come
+    and the store is returned.
+    """
+
+    text = TextFile(filename)
+    sentences = profiler.iterate('sentence tokenization', text.iter_sentences())
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 and store is None:
+        return count_word_forms(sentences, enclitics, profiler)
+
+    unique_word_forms = Counter() if store is None else store
+    if workers == 1:
+        for batch in batches(sentences, batch_size):
+            unique_word_forms.update(count_word_forms(batch, enclitics, profiler))
+        return unique_word_forms
+
+    def collect(future):
+        word_forms, report = future.result()
+        unique_word_forms.update(word_forms)
+        if report is not None:
+            profiler.merge(report)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep a few batches per worker in flight so that memory
+        # stays bounded however long the text is
+        pending = deque()
+        for batch in batches(sentences, batch_size):
+            pending.append(executor.submit(count_batch, batch, enclitics,
+                    profiler.enabled))
+            if len(pending) >= 2 * workers:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
 
     return unique_word_forms
 
-def list_possible_lemmata(word):
-    analyzer = Lemmatiseur()
-    potential_lemmata = analyzer.lemmatise_multiple(word)
-    for lemma in potential_lemmata:
-        for interpretation in lemma:
-            if interpretation['lemma'].islower():
-                print(interpretation)
-
-filename = 'allAPReadings.txt'
-word_list = compile_lemmata(filename)
-word_list = sorted(word_list.items())
-
-with open("unique_forms.csv","w",newline="") as f:
-    csv_writer = csv.writer(f, delimiter=",",
-            quotechar="|", quoting=csv.QUOTE_MINIMAL)
-    for key,value in word_list:
-        csv_writer.writerow([value,key])
+def list_possible_lemmata(word,lemmatizer=None):
+    """
+    Return the possible lemmata of a word, ignoring names. The
+    curated lexicons are tried first and cltk's lemmatizer only
+    for words they do not contain.
+    """
+    from lemmatizer import get_lemmatizer
+
+    lemmatizer = lemmatizer or get_lemmatizer()
+    return [lemma for lemma in lemmatizer.lemmatize(word) if lemma.islower()]
+
+class FormCounts:
+    """
+
+    FormCounts keeps word form counts under both the exact
+    spelling and its macron-folded key, so that a text with
+    macrons and one without can be compared, and a form can
+    be looked up either way, without refolding the counts.
+    Each distinct spelling is folded once, when it is added.
+
+    ...
+
+    Attributes
+    ----------
+    exact : Counter
+        spelling -> count
+
+    folded : Counter
+        folded spelling -> count of all its spellings
+
+    spellings : dict
+        folded spelling -> set of the spellings counted under it
+
+    Methods
+    -------
+    update(word_forms)
+        Adds the counts of a dict of word forms
+
+    count(form)
+        Returns the count of exactly this spelling
+
+    count_folded(form)
+        Returns the count of every spelling that folds to the
+        same key as form
+
+    variants(form)
+        Returns the sorted spellings that fold like form
+
+    """
+
+    def __init__(self,word_forms=None):
+        self.exact = Counter()
+        self.folded = Counter()
+        self.spellings = {}
+        self._keys = {}
+        if word_forms:
+            self.update(word_forms)
+
+    def __len__(self):
+        return len(self.exact)
+
+    def update(self,word_forms):
+        """ Add the counts of a dict of word forms """
+
+        for form, count in word_forms.items():
+            key = self._keys.get(form)
+            if key is None:
+                key = self._keys[form] = fold_macrons(form)
+                self.spellings.setdefault(key, set()).add(form)
+            self.exact[form] += count
+            self.folded[key] += count
+
+    def count(self,form):
+        """ Return the count of exactly this spelling """
+
+        return self.exact.get(form, 0)
+
+    def count_folded(self,form):
+        """ Return the count of every spelling that folds like form """
+
+        return self.folded.get(fold_macrons(form), 0)
+
+    def variants(self,form):
+        """ Return the sorted spellings that fold like form """
+
+        return sorted(self.spellings.get(fold_macrons(form), ()))
+
+def write_unique_forms(word_forms,output,output_format='csv',max_items=1 << 20):
+    """
+    Write word forms and their counts, sorted by form. The csv,
+    jsonl and columnar formats are streamed by the writers
+    module, spilling sorted runs to disk past max_items forms;
+    a FrequencyStore is streamed from its own sorted runs.
+    """
+
+    if isinstance(word_forms, FrequencyStore):
+        # already merged in sorted order from its runs on disk
+        items = word_forms.items()
+    else:
+        items = sorted(word_forms.items()) if output_format == 'json' else None
+
+    if output_format == 'json':
+        with open(output,"w") as f:
+            json.dump(dict(items), f, ensure_ascii=False, indent=0)
+    elif items is not None:
+        write_sorted_counts(items, output, output_format)
+    else:
+        write_counts(word_forms.items(), output, output_format, max_items)
+
+def main(argv=None):
+    """ Compile the unique word forms of a text and write them out """
+
+    parser = argparse.ArgumentParser(description=
+            "Write the unique word forms of a Latin text, minus proper names")
+    parser.add_argument("input", nargs="?", default="allAPReadings.txt",
+            help="the .txt file to process")
+    parser.add_argument("-o", "--output", default="unique_forms.csv",
+            help="where to write the word forms")
+    parser.add_argument("-f", "--format", default="csv",
+            choices=["csv", "json", "jsonl", "columnar"], help="the output format")
+    parser.add_argument("--max-items", type=int, default=1 << 20,
+            help="word forms to sort in memory before spilling to disk")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+            help="processes to use; 0 uses every core")
+    parser.add_argument("-e", "--enclitics", nargs="+", default=["que"],
+            choices=["que", "ne", "ve"], help="enclitics to split off")
+    parser.add_argument("--memory-limit", type=int, metavar="MB",
+            help="count in a FrequencyStore that spills to disk past this size")
+    parser.add_argument("-m", "--fold-macrons", action="store_true",
+            help="count spellings with and without macrons together")
+    parser.add_argument("-i", "--incremental", action="store_true",
+            help="only reprocess passages that changed since the last run")
+    parser.add_argument("--cache-dir", default=".passage_cache",
+            help="where --incremental keeps the counts of each passage")
+    parser.add_argument("--profile", action="store_true",
+            help="print the time spent in each stage")
+    parser.add_argument("--profile-json", metavar="PATH",
+            help="write the time spent in each stage to a json file")
+    args = parser.parse_args(argv)
+
+    profile = args.profile or args.profile_json
+    profiler = Profiler() if profile else NULL_PROFILER
+
+    store = None
+    if args.memory_limit and not args.incremental:
+        # the store folds macrons itself, so the counts stay bounded
+        store = FrequencyStore(args.memory_limit << 20,
+                directory=os.path.dirname(os.path.abspath(args.output)),
+                fold=args.fold_macrons)
+    try:
+        if args.incremental:
+            from incremental import PassageCache
+            cache = PassageCache(args.cache_dir, args.enclitics)
+            word_forms = cache.compile(args.input, workers=args.workers or None,
+                    profiler=profiler)
+            print(f"{cache.hits} passages cached, {cache.misses} processed",
+                    file=sys.stderr)
+        else:
+            word_forms = compile_lemmata(args.input, tuple(args.enclitics),
+                    workers=args.workers or None, profiler=profiler, store=store)
+
+        if args.fold_macrons and store is None:
+            word_forms = FormCounts(word_forms).folded
+
+        with profiler.stage('writing'):
+            write_unique_forms(word_forms, args.output, args.format, args.max_items)
+    finally:
+        if store is not None:
+            store.close()
+
+    if args.profile:
+        print(profiler.summary(), file=sys.stderr)
+    if args.profile_json:
+        profiler.write_json(args.profile_json)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+from time import perf_counter
+import json
+
+class Stage:
+    """
+    Times the body of a with statement for one Profiler stage;
+    tokens may be set inside the body once they are known
+    """
+
+    __slots__ = ('profiler', 'name', 'tokens', 'start')
+
+    def __init__(self,profiler,name,tokens):
+        self.profiler = profiler
+        self.name = name
+        self.tokens = tokens
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self,*exc_info):
+        self.profiler.add(self.name, perf_counter() - self.start, 1, self.tokens)
+
+class NullStage:
+    """ A stage that does nothing, shared by every NullProfiler call """
+
+    # accepts the tokens a body sets, and ignores them
+    __slots__ = ('tokens',)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc_info):
+        pass
+
+NULL_STAGE = NullStage()
+
+class Profiler:
+    """
+
+    Profiler records the wall time, number of calls and tokens
+    handled by each stage of the pipeline, along with the hits
+    and misses of any caches the stages use.
+
+    ...
+
+    Attributes
+    ----------
+    enabled : bool
+        True; lets callers skip bookkeeping for a NullProfiler
+
+    stages : dict
+        stage name -> [seconds, calls, tokens]
+
+    caches : dict
+        cache name -> [hits, misses]
+
+    Methods
+    -------
+    stage(name, tokens)
+        Returns a context manager that times one call; its
+        tokens can be set in the with block
+
+    iterate(name, iterable)
+        Yields from iterable, timing each item it produces
+
+    add(name, seconds, calls, tokens)
+        Adds to the totals of a stage
+
+    count_cache(name, hits, misses)
+        Adds to the totals of a cache
+
+    merge(report)
+        Adds the totals of another Profiler's report()
+
+    report()
+        Returns the totals as a dict ready for json
+
+    summary()
+        Returns the totals as a table
+
+    write_json(path)
+        Writes report() to a file
+
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}
+        self.caches = {}
+        self.started = perf_counter()
+
+    def stage(self,name,tokens=0):
+        """ Return a context manager that times one call of a stage """
+
+        return Stage(self, name, tokens)
+
+    def iterate(self,name,iterable):
+        """ Yield from iterable, charging the time to produce each item """
+
+        iterator = iter(iterable)
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, perf_counter() - start, 0)
+                return
+            self.add(name, perf_counter() - start)
+            yield item
+
+    def add(self,name,seconds,calls=1,tokens=0):
+        """ Add to the totals of a stage """
+
+        totals = self.stages.get(name)
+        if totals is None:
+            totals = self.stages[name] = [0.0, 0, 0]
+        totals[0] += seconds
+        totals[1] += calls
+        totals[2] += tokens
+
+    def count_cache(self,name,hits,misses):
+        """ Add to the hit and miss totals of a cache """
+
+        totals = self.caches.setdefault(name, [0, 0])
+        totals[0] += hits
+        totals[1] += misses
+
+    def merge(self,report):
+        """ Add the totals of a report from another Profiler """
+
+        for name, stage in report['stages'].items():
+            self.add(name, stage['seconds'], stage['calls'], stage['tokens'])
+        for name, cache in report['caches'].items():
+            self.count_cache(name, cache['hits'], cache['misses'])
+
+    def report(self):
+        """ Return the totals as a dict """
+
+        stages = {}
+        for name, (seconds, calls, tokens) in self.stages.items():
+            stages[name] = {
+                    'seconds': seconds,
+                    'calls': calls,
+                    'tokens': tokens,
+                    'tokens_per_sec': tokens / seconds if seconds and tokens else None,
+                    }
+
+        caches = {}
+        for name, (hits, misses) in self.caches.items():
+            lookups = hits + misses
+            caches[name] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': hits / lookups if lookups else None,
+                    }
+
+        return {'wall_seconds': perf_counter() - self.started,
+                'stages': stages, 'caches': caches}
+
+    def summary(self):
+        """ Return the totals as a printable table """
+
+        report = self.report()
+        lines = [f"{'stage':<24}{'seconds':>10}{'calls':>10}{'tokens':>10}{'tokens/sec':>14}"]
+        for name, stage in report['stages'].items():
+            rate = stage['tokens_per_sec']
+            rate = f"{rate:,.0f}" if rate else '-'
+            lines.append(f"{name:<24}{stage['seconds']:>10.3f}{stage['calls']:>10}"
+                    f"{stage['tokens']:>10}{rate:>14}")
+
+        if report['caches']:
+            lines.append('')
+            lines.append(f"{'cache':<24}{'hits':>10}{'misses':>10}{'hit rate':>10}")
+            for name, cache in report['caches'].items():
+                rate = cache['hit_rate']
+                rate = f"{rate:.1%}" if rate is not None else '-'
+                lines.append(f"{name:<24}{cache['hits']:>10}{cache['misses']:>10}{rate:>10}")
+
+        lines.append('')
+        lines.append(f"wall time {report['wall_seconds']:.3f}s")
+        return "\n".join(lines)
+
+    def write_json(self,path):
+        """ Write the report to a json file """
+
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+class NullProfiler:
+    """
+
+    NullProfiler has the methods of Profiler but records
+    nothing, so that instrumented code can always call a
+    profiler; iterate() hands back the iterable untouched
+    and stage() returns one shared no-op context manager.
+
+    """
+
+    enabled = False
+
+    def stage(self,name,tokens=0):
+        return NULL_STAGE
+
+    def iterate(self,name,iterable):
+        return iterable
+
+    def add(self,name,seconds,calls=1,tokens=0):
+        pass
+
+    def count_cache(self,name,hits,misses):
+        pass
+
+    def merge(self,report):
+        pass
+
+NULL_PROFILER = NullProfiler()
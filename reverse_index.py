@@ -0,0 +1,162 @@
+from make_synopsis import noun_paradigm, paradigm_table, PARADIGM_CELLS
+import argparse
+import csv
+import json
+
+def read_noun_stems(filename='ap_pos.csv'):
+    """ Return the distinct noun stems of ap_pos.csv, sorted """
+
+    with open(filename, newline='') as f:
+        rows = csv.DictReader(f)
+        return sorted({row['stem'] for row in rows if row['pos'] == 'noun'})
+
+class ReverseIndex:
+    """
+
+    ReverseIndex maps every form generated from a lexicon of
+    stems back to all of its parses, so that a word in a text
+    can be identified with a single dict lookup.
+
+    Each parse is stored as one integer, the stem's position
+    in self.stems times the number of paradigm cells plus the
+    cell's position in PARADIGM_CELLS, which keeps the index
+    small even for a large lexicon.
+
+    ...
+
+    Attributes
+    ----------
+    stems : list
+        the stems that have been added, in order
+
+    forms : dict
+        generated form -> tuple of encoded parses
+
+    skipped : list
+        stems the sound change rules could not yet handle
+
+    Methods
+    -------
+    add_noun(stem, gender)
+        Generates every cell of the noun and indexes it
+
+    add_paradigm(stem, paradigm)
+        Indexes forms in PARADIGM_CELLS order
+
+    parse(form)
+        Returns a list of (stem, case, number) tuples
+
+    parse_tokens(tokens)
+        Returns a dict of each token and its parses
+
+    save(path)
+        Writes the index to a JSON file
+
+    load(path)
+        Returns an index read from a JSON file
+
+    """
+
+    def __init__(self):
+        self.stems = []
+        self.forms = {}
+        self.skipped = []
+
+    def __len__(self):
+        return len(self.forms)
+
+    def __contains__(self,form):
+        return form in self.forms
+
+    def add_noun(self,stem,gender=None):
+        """ Index every cell of the noun; return False if it failed """
+
+        try:
+            paradigm = noun_paradigm(stem, gender)
+        except (IndexError, KeyError, TypeError):
+            paradigm = None
+        return self.add_paradigm(stem, paradigm)
+
+    def add_paradigm(self,stem,paradigm):
+        """ Index forms already generated for a stem, or skip None """
+
+        if paradigm is None:
+            self.skipped.append(stem)
+            return False
+
+        stem_id = len(self.stems)
+        self.stems.append(stem)
+        base = stem_id * len(PARADIGM_CELLS)
+        for cell_id, form in enumerate(paradigm):
+            if not form:
+                continue
+            code = base + cell_id
+            parses = self.forms.get(form, ())
+            if code not in parses:
+                self.forms[form] = parses + (code,)
+        return True
+
+    def decode(self,code):
+        """ Return the (stem, case, number) of an encoded parse """
+
+        stem_id, cell_id = divmod(code, len(PARADIGM_CELLS))
+        case, number = PARADIGM_CELLS[cell_id].split('_')
+        return (self.stems[stem_id], case, number)
+
+    def parse(self,form):
+        """ Return every (stem, case, number) that generates form """
+
+        return [self.decode(code) for code in self.forms.get(form, ())]
+
+    def parse_tokens(self,tokens):
+        """ Return a dict of each distinct token and its parses """
+
+        return {token: self.parse(token) for token in set(tokens)}
+
+    def save(self,path):
+        """ Write the index to a JSON file """
+
+        with open(path, 'w') as f:
+            json.dump({'cells': PARADIGM_CELLS, 'stems': self.stems,
+                    'forms': self.forms}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls,path):
+        """ Return an index read from a JSON file written by save() """
+
+        with open(path) as f:
+            data = json.load(f)
+        if tuple(data['cells']) != PARADIGM_CELLS:
+            raise ValueError(f"{path} was built for different paradigm cells")
+
+        index = cls()
+        index.stems = data['stems']
+        index.forms = {form: tuple(codes) for form, codes in data['forms'].items()}
+        return index
+
+def build_reverse_index(stems,gender=None):
+    """ Return a ReverseIndex of every cell of every stem """
+
+    index = ReverseIndex()
+    for stem, paradigm in paradigm_table(stems, gender).items():
+        index.add_paradigm(stem, paradigm)
+    return index
+
+def main(argv=None):
+    """ Build the reverse index of the lexicon's nouns and save it """
+
+    parser = argparse.ArgumentParser(description=
+            "Index every generated noun form back to its stem and cell")
+    parser.add_argument("lexicon", nargs="?", default="ap_pos.csv",
+            help="a csv with stem and pos columns")
+    parser.add_argument("-o", "--output", default="noun_forms.json",
+            help="where to save the index")
+    args = parser.parse_args(argv)
+
+    index = build_reverse_index(read_noun_stems(args.lexicon))
+    index.save(args.output)
+    print(f"{len(index.stems)} stems, {len(index)} forms; "
+            f"{len(index.skipped)} stems skipped")
+
+if __name__ == '__main__':
+    main()
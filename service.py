@@ -0,0 +1,227 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+
+from process_txt_file import annotate, get_normalizer
+
+class ServiceBusy(Exception):
+    """ Raised when a request arrives while the request queue is full """
+
+def warm_up():
+    """ Build the shared tokenizer in a worker before any request """
+
+    get_normalizer()
+
+def split_sentences(text):
+    """ Return the sentences of a passage """
+
+    return get_normalizer().sentences(text)
+
+def analyse_sentence(index,sentence,enclitics=('que',)):
+    """
+    Return a dict of one sentence's results: its index in the
+    passage, the sentence, its word forms as compile_lemmata
+    counts them and the proper nouns that were left out
+    """
+
+    forms = []
+    proper_nouns = []
+    for record in annotate([sentence], enclitics):
+        if record.proper:
+            proper_nouns.append(record.original)
+        else:
+            forms.append(record.normalized)
+
+    return {'index': index, 'sentence': sentence, 'forms': forms,
+            'proper_nouns': proper_nouns}
+
+class ParserService:
+    """
+
+    ParserService accepts passages of text from asyncio code and
+    runs the CPU-bound stages on a bounded pool of workers,
+    streaming each sentence's results back as soon as it is
+    done. Each worker builds the sentence tokenizer and the
+    proper noun tagger once and shares them across requests.
+
+    Three limits give backpressure: at most max_in_flight
+    sentences are queued or running on the pool across all
+    requests, and a sentence's slot is only freed once its
+    work has finished, even if the caller has stopped waiting
+    for it; at most max_requests passages are handled at once,
+    and later ones wait their turn; at most max_queued
+    passages wait, and any more raise ServiceBusy.
+
+    ...
+
+    Attributes
+    ----------
+    enclitics : tuple
+        the enclitics split off, as for compile_lemmata
+
+    queued : int
+        requests waiting for one of the max_requests turns
+
+    in_flight : int
+        sentences queued or running on the pool
+
+    Methods
+    -------
+    process(text)
+        An async generator of per-sentence result dicts, in
+        the order they finish; each carries its index
+
+    close()
+        Shuts the worker pool down
+
+    """
+
+    def __init__(self,workers=None,max_in_flight=64,max_requests=32,
+            max_queued=128,use_processes=True,enclitics=('que',)):
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = pool(max_workers=workers, initializer=warm_up)
+        self._max_in_flight = max_in_flight
+        self._max_requests = max_requests
+        self._max_queued = max_queued
+        self._slots = None
+        self._turns = None
+        self.queued = 0
+        self.in_flight = 0
+        self.enclitics = tuple(enclitics)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self,*exc_info):
+        await self.close()
+
+    async def close(self):
+        """ Shut the worker pool down once running work has finished """
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+
+    async def _take_turn(self):
+        """ Wait for one of the max_requests turns, if the queue has room """
+
+        if self._slots is None:
+            # created here so that they belong to the running loop
+            self._slots = asyncio.Semaphore(self._max_in_flight)
+            self._turns = asyncio.Semaphore(self._max_requests)
+
+        if self._turns.locked() and self.queued >= self._max_queued:
+            raise ServiceBusy(f"{self.queued} requests already queued")
+        self.queued += 1
+        try:
+            await self._turns.acquire()
+        finally:
+            self.queued -= 1
+
+    def _submit(self,loop,index,sentence):
+        """
+        Start one sentence on the pool; its slot is released when
+        the work itself finishes, or when it is cancelled before
+        it starts, never merely because the caller stopped waiting
+        """
+
+        self.in_flight += 1
+        future = self._executor.submit(analyse_sentence, index, sentence,
+                self.enclitics)
+
+        def finished(future):
+            try:
+                loop.call_soon_threadsafe(self._finish)
+            except RuntimeError:
+                # the loop has closed; nobody is left to wait on a slot
+                pass
+
+        future.add_done_callback(finished)
+        return future
+
+    def _finish(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+    async def process(self,text):
+        """ Yield a result dict for each sentence as it finishes """
+
+        await self._take_turn()
+        loop = asyncio.get_running_loop()
+        # concurrent futures, which stay running after the caller leaves
+        started = []
+        pending = set()
+        try:
+            sentences = await loop.run_in_executor(self._executor, split_sentences, text)
+
+            for index, sentence in enumerate(sentences):
+                await self._slots.acquire()
+                future = self._submit(loop, index, sentence)
+                started.append(future)
+                pending.add(asyncio.wrap_future(future, loop=loop))
+
+                for done in [done for done in pending if done.done()]:
+                    pending.discard(done)
+                    yield done.result()
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    yield future.result()
+        finally:
+            # the caller stopped early or a sentence failed: sentences
+            # not yet started are dropped and give their slots back, and
+            # those already running keep theirs until they finish
+            for future in started:
+                future.cancel()
+            self._turns.release()
+
+class LocalClient:
+    """
+
+    LocalClient calls a ParserService in the same process, the
+    way a request handler would, so the service can be tried
+    out and tested without a server.
+
+    ...
+
+    Methods
+    -------
+    stream(text)
+        An async generator of per-sentence results
+
+    analyse(text)
+        Returns every sentence's results, in sentence order
+
+    count_forms(text)
+        Returns a Counter of the passage's word forms
+
+    """
+
+    def __init__(self,service):
+        self.service = service
+
+    async def stream(self,text):
+        """ Yield per-sentence results as the service finishes them """
+
+        results = self.service.process(text)
+        try:
+            async for result in results:
+                yield result
+        finally:
+            # free the request's slots even if the caller stopped early
+            await results.aclose()
+
+    async def analyse(self,text):
+        """ Return every sentence's results, in sentence order """
+
+        results = [result async for result in self.stream(text)]
+        return sorted(results, key=lambda result: result['index'])
+
+    async def count_forms(self,text):
+        """ Return a Counter of the word forms of the passage """
+
+        counts = Counter()
+        async for result in self.stream(text):
+            counts.update(result['forms'])
+        return counts
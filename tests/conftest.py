@@ -0,0 +1,44 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# the modules live at the top of the repository, beside this directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture
+def in_repo(monkeypatch):
+    """ Run a test from the repository, where the texts and lexicons are """
+
+    monkeypatch.chdir(ROOT)
+    return ROOT
+
+@pytest.fixture(scope='session')
+def lemmatizer(tmp_path_factory):
+    """
+    A Lemmatizer of the repository's lexicons, compiled in a
+    temporary directory rather than beside the csv files
+    """
+
+    from lemmatizer import LEXICONS, Lemmatizer
+    directory = tmp_path_factory.mktemp('lexicons')
+    paths = []
+    for path in LEXICONS:
+        shutil.copy(os.path.join(ROOT, path), directory)
+        paths.append(str(directory / path))
+    return Lemmatizer(paths)
+
+@pytest.fixture
+def sample_text(tmp_path, monkeypatch):
+    """
+    The opening passages of allAPReadings.txt in a file of the
+    working directory, as TextFile expects; returns its name
+    """
+
+    with open(os.path.join(ROOT, 'allAPReadings.txt'), encoding='utf-8') as f:
+        lines = [next(f) for i in range(120)]
+    (tmp_path / 'sample.txt').write_text(''.join(lines), encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    return 'sample.txt'
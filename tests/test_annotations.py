@@ -0,0 +1,45 @@
+from collections import Counter
+
+import pytest
+
+pytest.importorskip('cltk')
+
+from annotations import FIELDS, TokenTable, annotate_passages, write_annotations
+from incremental import split_passages
+from process_txt_file import annotate, count_word_forms, get_normalizer
+
+SENTENCE = "Arma virumque canō, Trōiae quī prīmus ab ōrīs\nĪtaliam fātō profugus Lāvīniaque vēnit"
+
+WORDS = ['Arma', 'virumque', 'canō', 'Trōiae', 'quī', 'prīmus', 'ab', 'ōrīs',
+        'Ītaliam', 'fātō', 'profugus', 'Lāvīniaque', 'vēnit']
+
+def test_original_is_the_text_as_written():
+    records = list(annotate([SENTENCE]))
+    assert [record.original for record in records] == WORDS
+    assert [record.token for record in records] == list(range(len(WORDS)))
+
+    virumque = records[1]
+    assert (virumque.original, virumque.normalized, virumque.enclitic) == \
+            ('virumque', 'uirum', 'que')
+
+def test_table_keeps_every_record(sample_text):
+    with open(sample_text, encoding='utf-8') as f:
+        text = f.read()
+    records = list(annotate_passages(text))
+    table = TokenTable(records)
+
+    assert len(table) == len(records)
+    assert list(table.rows()) == [tuple(getattr(record, field) for field in FIELDS)
+            for record in records]
+
+    expected = Counter()
+    for passage_id, passage in split_passages(text):
+        expected.update(count_word_forms(get_normalizer().sentences(passage)))
+    assert table.counts() == expected
+
+def test_written_annotations_have_the_original_column(tmp_path):
+    path = tmp_path / 'annotations.csv'
+    write_annotations(annotate([SENTENCE]), str(path))
+    lines = path.read_text().splitlines()
+    assert lines[0] == ','.join(FIELDS)
+    assert lines[2].split(',')[3:6] == ['virumque', 'uirum', 'que']
@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks import ListStem, UnslottedNoun, timed
+from make_synopsis import Noun
+
+def test_timed_counts_skipped_items():
+    units, latencies, skipped = timed([lambda: 3, lambda: None, lambda: 4])
+    assert (units, len(latencies), skipped) == (7, 3, 1)
+
+def test_unslotted_noun_runs_the_list_methods():
+    noun = UnslottedNoun('rēg', 'masculine')
+    assert isinstance(noun.__dict__['short_vowels'], list)
+    assert type(noun).__mro__.index(ListStem) == type(noun).__mro__.index(Noun) + 1
+    assert noun.acc_sg() == Noun('rēg', 'masculine').acc_sg() == 'rēgem'
+
+def test_normalization_times_the_tokenizer(sample_text):
+    pytest.importorskip('cltk')
+    from benchmarks import normalization_workload
+    from process_txt_file import TextFile, get_normalizer
+
+    units, latencies, skipped = normalization_workload(sample_text)()
+    sentences = list(TextFile(sample_text).iter_sentences())
+    assert len(latencies) == len(sentences)
+    assert skipped == 0
+    assert units == sum(len(get_normalizer().tokenize(sentence, ('que',)))
+            for sentence in sentences)
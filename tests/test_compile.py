@@ -0,0 +1,38 @@
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip('cltk')
+
+from process_txt_file import compile_lemmata
+
+def test_workers_count_the_same_as_a_serial_run(sample_text):
+    serial = compile_lemmata(sample_text)
+    assert serial
+    assert compile_lemmata(sample_text, workers=2, batch_size=4) == serial
+
+def test_profile_counts_tokens_and_caches(sample_text):
+    import make_synopsis
+    from conftest import ROOT
+    from lemmatizer import LEXICONS
+    from profiling import Profiler
+
+    # get_lemmatizer() reads the lexicons from the working directory
+    for path in LEXICONS:
+        shutil.copy(os.path.join(ROOT, path), path)
+
+    make_synopsis.noun_paradigm('rēg', None)
+    profiler = Profiler()
+    word_forms = compile_lemmata(sample_text, ('que', 'ne', 've'), profiler=profiler)
+    report = profiler.report()
+
+    normalization = report['stages']['normalization']
+    assert normalization['tokens'] >= sum(word_forms.values())
+    assert normalization['tokens_per_sec']
+    assert report['caches']['lexicon']['hits'] > 0
+    for name in ('proper nouns', 'lemma fallbacks', 'syllables', 'oblique stems',
+            'paradigms'):
+        assert name in report['caches']
+    # the paradigm built before compiling is not counted
+    assert report['caches']['paradigms'] == {'hits': 0, 'misses': 0, 'hit_rate': None}
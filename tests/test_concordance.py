@@ -0,0 +1,75 @@
+import pytest
+
+from concordance import (decode_postings, encode_postings, first_line,
+        numbered_lines)
+
+PASSAGE = """Vergil
+1.418-421
+Corripuēre viam intereā, quā sēmita mōnstrat.
+Iamque ascendēbant collem, quī plūrimus urbī
+
+imminet, adversāsque aspectat dēsuper arcēs.420
+Aenēās
+"""
+
+def test_postings_round_trip():
+    postings = [(0, 1, 0), (0, 1, 4), (0, 12, 2), (3, 1, 0), (3, 300, 17)]
+    assert decode_postings(encode_postings(postings)) == postings
+
+def test_first_line_of_a_range():
+    assert first_line('1.1-209\n') == 1
+    assert first_line('1.418-440') == 418
+    assert first_line('210-400') == 210
+
+def test_lines_are_numbered_from_the_range():
+    lines = list(numbered_lines(PASSAGE))
+    assert [number for number, line in lines] == [418, 419, 420, 421]
+    assert lines[2][1].endswith('420')
+    # a one-word text line is text, not an author
+    assert lines[3] == (421, 'Aenēās')
+
+def test_occurrences_are_at_their_verse(sample_text):
+    pytest.importorskip('cltk')
+    from concordance import Concordance, Occurrence
+
+    concordance = Concordance.build(sample_text)
+    assert concordance.occurrences('arma')[0] == Occurrence('Vergil 1.1-209', 1, 0)
+    assert concordance.occurrences('conderet')[0].line == 5
+    assert concordance.occurrences('īnsignem')[0].line == 10
+
+def test_save_and_load(sample_text, tmp_path):
+    pytest.importorskip('cltk')
+    from concordance import Concordance
+
+    concordance = Concordance.build(sample_text)
+    path = str(tmp_path / 'sample.conc')
+    concordance.save(path)
+    loaded = Concordance.load(path)
+    assert loaded.passages == concordance.passages
+    assert loaded.forms() == concordance.forms()
+    for form in ('arma', 'uirum', 'conderet'):
+        assert loaded.occurrences(form) == concordance.occurrences(form)
+    assert loaded.cooccurrences('arma', 'conderet', lines=4) == \
+            concordance.cooccurrences('arma', 'conderet', lines=4)
+    assert not concordance.cooccurrences('arma', 'conderet', lines=3)
+
+class Lexicon:
+    """ the parts of a Lemmatizer lemma_forms() reads """
+
+    def __init__(self,forms):
+        self.forms = forms
+        self.folded = {}
+
+def test_lemma_forms_follow_the_lemmatizer():
+    from concordance import Concordance
+
+    postings = {'arma': [0, 1, 0], 'armīs': [0, 9, 2], 'uirum': [0, 1, 1]}
+    concordance = Concordance.from_postings(['Vergil 1.1-209'], postings)
+    first = Lexicon({'arma': ('arma',), 'armīs': ('arma',)})
+    second = Lexicon({'arma': ('armō',), 'uirum': ('uir',)})
+
+    assert concordance.lemma_forms('arma', first) == ['arma', 'armīs']
+    assert concordance.lemma_forms('arma', second) == []
+    assert concordance.lemma_forms('armō', second) == ['arma']
+    assert [occurrence.line for occurrence in
+            concordance.lemma_occurrences('arma', first)] == [1, 9]
@@ -0,0 +1,73 @@
+import pytest
+
+from tokenizer import split_enclitic, tokenize
+
+KNOWN = {
+        'est': ('sum',), 'uirum': ('uir',), 'bene': ('bene',), 'omne': ('omnis',),
+        'sine': ('sine',), 'si': ('sī',), 'ex': ('ex',), 'exue': ('exuō',),
+        'quid': ('quis',), 'quidue': ('quis',), 'mē': ('ego',), 'mēne': ('ego',),
+        'legiō': ('legiō',), 'legiōne': ('legiō',),
+        }
+
+@pytest.mark.parametrize('word, expected', [
+        ('uirumque', ('uirum', 'que')),
+        ('Arma', ('Arma', None)),
+        ('atque', ('atque', None)),
+        ('quīcumque', ('quīcumque', None)),
+        ('itaque', ('itaque', None)),
+        ('que', ('que', None)),
+        ])
+def test_que(word, expected):
+    assert split_enclitic(word) == expected
+
+@pytest.mark.parametrize('word, expected', [
+        ('estne', ('est', 'ne')),
+        ('uirumue', ('uirum', 've')),
+        ('uirumve', ('uirum', 've')),
+        # the lexicon lists the whole word under the stem's lemma
+        ('quidue', ('quid', 've')),
+        # whatever letter the stem ends in
+        ('mēne', ('mē', 'ne')),
+        # the rest of the word is not a known form
+        ('breue', ('breue', None)),
+        ('graue', ('graue', None)),
+        ('leue', ('leue', None)),
+        ('cane', ('cane', None)),
+        ('mane', ('mane', None)),
+        # the word is a form in its own right
+        ('bene', ('bene', None)),
+        ('omne', ('omne', None)),
+        ('siue', ('siue', None)),
+        ('sine', ('sine', None)),
+        # a form of another lemma
+        ('exue', ('exue', None)),
+        # a case form of the stem's own lemma
+        ('legiōne', ('legiōne', None)),
+        ])
+def test_ne_and_ve_need_a_known_stem(word, expected):
+    assert split_enclitic(word, ('que', 'ne', 've'), KNOWN) == expected
+
+def test_ne_and_ve_are_not_split_without_a_lexicon():
+    assert split_enclitic('estne', ('ne',)) == ('estne', None)
+    assert split_enclitic('uirumue', ('ve',)) == ('uirumue', None)
+
+def test_only_requested_enclitics_are_split():
+    assert split_enclitic('estne', ('que',), KNOWN) == ('estne', None)
+    assert split_enclitic('uirumque', ('ne',), KNOWN) == ('uirumque', None)
+
+def test_tokenize_keeps_case_of_base():
+    tokens = list(tokenize('Uirumque breue estne', ('que', 'ne', 've'), known=KNOWN))
+    assert [(token.base, token.enclitic) for token in tokens] == [
+            ('Uirum', 'que'), ('breue', None), ('est', 'ne')]
+
+@pytest.mark.parametrize('word', ['breue', 'graue', 'leue', 'cane', 'mane', 'bene',
+        'omne', 'sine', 'exue', 'obrue', 'legiōne', 'ratiōne', 'ratione'])
+def test_lexicon_keeps_whole_words(lemmatizer, word):
+    assert split_enclitic(word, ('ne', 've'), lemmatizer) == (word, None)
+
+@pytest.mark.parametrize('word, base', [('quidue', 'quid'), ('uelintne', 'uelint'),
+        ('coniūnxne', 'coniūnx'), ('coniunxne', 'coniunx'), ('mēne', 'mē'),
+        ('tantaene', 'tantae'), ('tantane', 'tanta'), ('comitemne', 'comitem'),
+        ('egone', 'ego'), ('tune', 'tu')])
+def test_lexicon_confirms_stems(lemmatizer, word, base):
+    assert split_enclitic(word, ('ne', 've'), lemmatizer)[0] == base
@@ -0,0 +1,52 @@
+import csv
+import unicodedata
+
+import pytest
+
+from process_txt_file import FormCounts
+
+PRECOMPOSED = 'canō'
+DECOMPOSED = unicodedata.normalize('NFD', PRECOMPOSED)
+
+def test_exact_and_folded_counts():
+    assert DECOMPOSED != PRECOMPOSED
+    counts = FormCounts({PRECOMPOSED: 2, DECOMPOSED: 1, 'cano': 4, 'arma': 1})
+    counts.update({DECOMPOSED: 2, 'Trōiae': 1})
+
+    # each spelling keeps its own exact count
+    assert counts.count(PRECOMPOSED) == 2
+    assert counts.count(DECOMPOSED) == 3
+    assert counts.count('cano') == 4
+    assert len(counts) == 5
+
+    # and all three fold to one key, however the form is asked for
+    for form in (PRECOMPOSED, DECOMPOSED, 'cano'):
+        assert counts.count_folded(form) == 9
+    assert counts.folded == {'cano': 9, 'arma': 1, 'Troiae': 1}
+    assert counts.variants(DECOMPOSED) == sorted([PRECOMPOSED, DECOMPOSED, 'cano'])
+    assert counts.variants('uirum') == []
+
+def test_breves_fold_too():
+    counts = FormCounts({'Ĭtaliam': 1, unicodedata.normalize('NFD', 'Ĭtaliam'): 1,
+            'Italiam': 1})
+    assert counts.folded == {'Italiam': 3}
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return {row[1]: int(row[0]) for row in csv.reader(f)}
+
+@pytest.mark.parametrize('options', [[], ['--memory-limit', '1']])
+def test_fold_macrons_output(tmp_path, monkeypatch, options):
+    pytest.importorskip('cltk')
+    from process_txt_file import main
+
+    monkeypatch.chdir(tmp_path)
+    text = f"{PRECOMPOSED} et cano et {DECOMPOSED} arma. Arma canō.\n"
+    (tmp_path / 'text.txt').write_text(text, encoding='utf-8')
+
+    main(['text.txt', '-o', 'exact.csv'] + options)
+    main(['text.txt', '-m', '-o', 'folded.csv'] + options)
+    exact = read_csv('exact.csv')
+    assert exact[PRECOMPOSED] == 2
+    assert exact['cano'] == 1
+    assert read_csv('folded.csv') == {'arma': 2, 'cano': 4, 'et': 2}
@@ -0,0 +1,82 @@
+from collections import Counter
+import os
+import random
+
+import pytest
+
+from frequency import ENTRY_OVERHEAD, FrequencyStore, Segment
+from tokenizer import fold_macrons
+
+def random_counts(seed=0):
+    generator = random.Random(seed)
+    letters = 'aeiouāēīōūmnrst'
+    forms = [''.join(generator.choice(letters) for n in range(generator.randint(1, 8)))
+            for n in range(2000)]
+    batches = []
+    for n in range(20):
+        batches.append(Counter(generator.choice(forms) for n in range(500)))
+    return batches
+
+def test_segment_round_trip():
+    items = sorted({'arma': 1, 'canō': 2, 'uirum': 3, 'ā': 1}.items())
+    segment = Segment(items)
+    assert len(segment) == 4
+    assert list(segment) == items
+
+@pytest.mark.parametrize('max_bytes,table_size', [
+        (256 << 20, 1 << 16), (256 << 20, 50), (4000, 1 << 16), (2000, 7)])
+def test_counts_match_a_counter(tmp_path, max_bytes, table_size):
+    expected = Counter()
+    with FrequencyStore(max_bytes, table_size, str(tmp_path), max_segments=2) as store:
+        for batch in random_counts():
+            store.update(batch)
+            expected.update(batch)
+            assert len(store) == len(expected)
+            # the budget holds as forms are added, not only as the dict fills
+            assert store.nbytes() <= max_bytes
+            assert len(store.runs) <= store.max_runs
+        assert list(store.items()) == sorted(expected.items())
+        assert list(store.items()) == sorted(expected.items())
+        if max_bytes < 256 << 20:
+            assert store.runs
+    assert os.listdir(tmp_path) == []
+
+def test_a_small_vocabulary_is_bounded(tmp_path):
+    # fewer new forms than fill the dict still spill past max_bytes
+    max_bytes = 10 * ENTRY_OVERHEAD
+    store = FrequencyStore(max_bytes, directory=str(tmp_path))
+    for n in range(30):
+        store.add(f"form{n}")
+        store.add(f"form{n // 2}")
+    assert store.runs
+    assert len(store) == 30
+    assert dict(store.items()) == {f"form{n}": 3 if n < 15 else 1 for n in range(30)}
+    store.close()
+    assert os.listdir(tmp_path) == []
+
+def test_folding(tmp_path):
+    counts = {'canō': 2, 'cano': 1, 'Trōiae': 1, 'arma': 3}
+    with FrequencyStore(300, directory=str(tmp_path), fold=True) as store:
+        store.update(counts)
+        assert len(store) == 3
+        expected = Counter()
+        for form, count in counts.items():
+            expected[fold_macrons(form)] += count
+        assert list(store.items()) == sorted(expected.items())
+
+def test_len_is_counted_once(tmp_path, monkeypatch):
+    store = FrequencyStore(300, directory=str(tmp_path))
+    store.update({'arma': 1, 'uirum': 2, 'canō': 3, 'Trōiae': 1})
+    store.update({'arma': 1, 'quī': 1})
+    assert store.runs
+    scans = []
+    items = store.items
+    monkeypatch.setattr(store, 'items', lambda: scans.append(1) or items())
+    assert len(store) == 5
+    assert len(store) == 5
+    assert len(scans) == 1
+    # a form new to the dict makes the next len() count again
+    store.add('prīmus')
+    assert len(store) == 6
+    assert len(scans) == 2
+    store.close()
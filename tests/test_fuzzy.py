@@ -0,0 +1,49 @@
+from fuzzy import BKTree, FuzzyMatcher, PrefixTrie, edit_distance, match_key
+
+FORMS = {
+    'arma': ('arma',),
+    'uirum': ('uir',),
+    'canō': ('canō',),
+    'Trōiae': ('Trōia',),
+}
+
+def test_edit_distance():
+    assert edit_distance('arma', 'arma') == 0
+    assert edit_distance('arma', 'arna') == 1
+    assert edit_distance('kitten', 'sitting') == 3
+    assert edit_distance('', 'abc') == 3
+    assert edit_distance('kitten', 'sitting', limit=1) == 2
+    assert edit_distance('a', 'abcdef', limit=2) == 3
+
+def test_match_key():
+    assert match_key('Vīrum') == 'uirum'
+    assert match_key('Iūnō') == match_key('Juno')
+
+def test_prefix_trie():
+    trie = PrefixTrie(['ar', 'arma', 'armis', 'uir'])
+    assert len(trie) == 4
+    assert trie.prefixes_of('armaque') == ['ar', 'arma']
+    assert trie.completions('arm') == ['arma', 'armis']
+    assert trie.completions('x') == []
+
+def test_bk_tree_agrees_with_a_scan():
+    words = ['arma', 'arna', 'armis', 'uirum', 'uirus', 'canō', 'cano']
+    tree = BKTree(words + ['arma'])
+    assert len(tree) == len(words)
+    for query in ('arma', 'uiram', 'cane', 'zzz'):
+        for max_distance in (0, 1, 2):
+            expected = sorted((edit_distance(query, word), word) for word in words
+                    if edit_distance(query, word) <= max_distance)
+            assert tree.search(query, max_distance) == expected
+
+def test_candidates():
+    matcher = FuzzyMatcher(FORMS)
+    assert matcher.unknown(['arma', 'Arma', 'armaque', 'uirun']) == ['armaque', 'uirun']
+    # a form followed by an enclitic is at distance zero
+    assert matcher.candidates('armaque') == [(0, 'arma', ('arma',))]
+    assert matcher.candidates('uirun') == [(1, 'uirum', ('uir',))]
+    assert matcher.candidates('Troiae') == [(0, 'Trōiae', ('Trōia',))]
+    assert matcher.candidates('xyzzy') == []
+    many = matcher.candidates_many(['uirun', 'Virun', 'uirun'])
+    assert list(many) == ['uirun', 'Virun']
+    assert many['Virun'] == many['uirun']
@@ -0,0 +1,53 @@
+import pytest
+
+from incremental import is_author_line, split_passages
+
+TEXT = """Vergil
+1.1-3
+Arma virumque canō, Trōiae quī prīmus ab ōrīs
+Ītaliam fātō profugus Lāvīniaque vēnit
+lītora, multum ille et terrīs iactātus et altō
+4-5
+vī superum, saevae memorem Iūnōnis ob īram,
+multa quoque et bellō passus, dum conderet urbem
+"""
+
+def test_passages_are_split_at_headers():
+    passages = split_passages(TEXT)
+    assert [passage_id for passage_id, text in passages] == ['Vergil 1.1-3', 'Vergil 4-5']
+    assert ''.join(text for passage_id, text in passages) == TEXT
+
+def test_author_lines():
+    assert is_author_line('\ufeffVergil\n')
+    assert not is_author_line('Arma virumque canō')
+
+def test_cache_reuses_passages_and_profiles(tmp_path, monkeypatch):
+    pytest.importorskip('cltk')
+    from incremental import PassageCache
+    from profiling import Profiler
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'text.txt').write_text(TEXT, encoding='utf-8')
+
+    first = PassageCache(str(tmp_path / 'cache'))
+    counts = first.compile('text.txt')
+    assert (first.hits, first.misses) == (0, 2)
+
+    profiler = Profiler()
+    second = PassageCache(str(tmp_path / 'cache'))
+    assert second.compile('text.txt', profiler=profiler) == counts
+    assert (second.hits, second.misses) == (2, 0)
+    assert profiler.caches['passages'] == [2, 0]
+    assert 'passage cache reads' in profiler.stages
+
+def test_status_goes_to_stderr(tmp_path, monkeypatch, capsys):
+    pytest.importorskip('cltk')
+    from process_txt_file import main
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'text.txt').write_text(TEXT, encoding='utf-8')
+    main(['text.txt', '-i', '--cache-dir', 'cache', '--profile'])
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert '0 passages cached, 2 processed' in captured.err
+    assert 'normalization' in captured.err
@@ -0,0 +1,69 @@
+from lemmatizer import Lemmatizer
+
+CSV = """count,word,stem,lemma,pos
+3,canō,can,canō,verb
+2,cane,can,canis,noun
+1,cane,can,canō,verb
+5,arma,arm,arma,noun
+"""
+
+class Backoff:
+    """ stands in for cltk's lemmatizer, recording what it is asked """
+
+    def __init__(self):
+        self.calls = []
+
+    def lemmatize(self,forms):
+        self.calls.append(list(forms))
+        return [(form, form.rstrip('s') if form != 'xyz' else None) for form in forms]
+
+def make_lemmatizer(tmp_path,cache_size=65536):
+    path = tmp_path / 'small.csv'
+    path.write_text(CSV, encoding='utf-8')
+    lemmatizer = Lemmatizer([str(path)], cache_size)
+    lemmatizer._backoff = Backoff()
+    return lemmatizer
+
+def test_exact_and_folded_tiers(tmp_path):
+    lemmatizer = make_lemmatizer(tmp_path)
+    assert lemmatizer.lemmatize('canō') == ('canō',)
+    assert lemmatizer.lemmatize('cane') == ('canis', 'canō')
+    # capitalized at the start of a sentence
+    assert lemmatizer.lemmatize('Arma') == ('arma',)
+    # printed without macrons
+    assert lemmatizer.lemmatize('cano') == ('canō',)
+    assert lemmatizer.get('cano') == ('canō',)
+    assert lemmatizer.get('uirum', ()) == ()
+    assert lemmatizer.stats() == {'lexicon_hits': 5, 'lexicon_misses': 1,
+            'cache_hits': 0, 'cache_misses': 0, 'fallbacks': 0, 'cache_size': 0}
+    assert lemmatizer._backoff.calls == []
+
+def test_fallback_is_cached(tmp_path):
+    lemmatizer = make_lemmatizer(tmp_path)
+    assert lemmatizer.lemmatize('uiros') == ('uiro',)
+    assert lemmatizer.lemmatize('uiros') == ('uiro',)
+    assert lemmatizer.lemmatize('xyz') == ()
+    assert lemmatizer.lemmatize('xyz') == ()
+    assert lemmatizer._backoff.calls == [['uiros'], ['xyz']]
+    assert lemmatizer.stats() == {'lexicon_hits': 0, 'lexicon_misses': 4,
+            'cache_hits': 2, 'cache_misses': 2, 'fallbacks': 2, 'cache_size': 2}
+
+def test_lemmatize_many_sends_unknown_forms_at_once(tmp_path):
+    lemmatizer = make_lemmatizer(tmp_path)
+    forms = ['arma', 'uiros', 'cano', 'uiros', 'rēgēs']
+    assert lemmatizer.lemmatize_many(forms) == [('arma',), ('uiro',), ('canō',),
+            ('uiro',), ('rēgē',)]
+    assert lemmatizer._backoff.calls == [['uiros', 'rēgēs']]
+    assert lemmatizer.stats()['fallbacks'] == 2
+
+def test_fallback_cache_is_bounded(tmp_path):
+    lemmatizer = make_lemmatizer(tmp_path, cache_size=2)
+    for form in ('aes', 'bes', 'ces'):
+        lemmatizer.lemmatize(form)
+    assert len(lemmatizer.cache) == 2
+    # the oldest answer was evicted and is asked for again
+    lemmatizer.lemmatize('ces')
+    lemmatizer.lemmatize('aes')
+    assert lemmatizer._backoff.calls == [['aes'], ['bes'], ['ces'], ['aes']]
+    assert lemmatizer.stats()['cache_hits'] == 1
+    assert lemmatizer.stats()['cache_size'] == 2
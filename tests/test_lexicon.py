@@ -0,0 +1,68 @@
+import os
+import unicodedata
+
+import pytest
+
+from lexicon import Lexicon, LexiconEntry, compile_lexicon, is_stale
+
+CSV = """count,word,stem,lemma,pos
+3,canō,can,canō,verb
+1,canit,can,canō,verb
+2,cane,can,canis,noun
+5,arma,arm,arma,noun
+1,Trōiae,Trōi,Trōia,noun
+"""
+
+@pytest.fixture
+def lexicon_csv(tmp_path):
+    path = tmp_path / 'small.csv'
+    path.write_text(CSV, encoding='utf-8')
+    return str(path)
+
+def test_every_column(lexicon_csv, tmp_path):
+    binary = str(tmp_path / 'small.lex')
+    compile_lexicon(lexicon_csv, binary)
+    with Lexicon(binary) as lexicon:
+        assert len(lexicon) == 5
+        assert set(lexicon.pos_tags) == {'', 'noun', 'verb'}
+        assert list(lexicon)[0] == LexiconEntry(3, 'canō', 'can', 'canō', 'verb')
+
+        assert lexicon.by_word('canit') == [LexiconEntry(1, 'canit', 'can', 'canō', 'verb')]
+        assert [entry.word for entry in lexicon.by_stem('can')] == ['canō', 'canit', 'cane']
+        assert [entry.word for entry in lexicon.by_lemma('canō')] == ['canō', 'canit']
+        assert [entry.lemma for entry in lexicon.by_folded('cano')] == ['canō']
+        assert [entry.word for entry in lexicon.by_folded('Troiae')] == ['Trōiae']
+        # a decomposed macron folds the same way as a precomposed one
+        decomposed = unicodedata.normalize('NFD', 'canō')
+        assert decomposed != 'canō'
+        assert [entry.word for entry in lexicon.by_folded(decomposed)] == ['canō']
+
+        for lookup in (lexicon.by_word, lexicon.by_stem, lexicon.by_lemma,
+                lexicon.by_folded):
+            assert lookup('uirum') == []
+        assert lexicon.by_word('cano') == []
+        assert lexicon.by_word('') == []
+
+def test_a_changed_csv_is_recompiled(lexicon_csv, tmp_path):
+    binary = str(tmp_path / 'small.lex')
+    assert is_stale(lexicon_csv, binary)
+    with Lexicon.open(lexicon_csv) as lexicon:
+        assert lexicon.path == binary
+        assert lexicon.by_word('uirum') == []
+    assert not is_stale(lexicon_csv, binary)
+
+    with open(lexicon_csv, 'a', encoding='utf-8') as f:
+        f.write("4,uirum,uir,uir,noun\n")
+    assert is_stale(lexicon_csv, binary)
+    with Lexicon.open(lexicon_csv) as lexicon:
+        assert [entry.lemma for entry in lexicon.by_word('uirum')] == ['uir']
+    assert not is_stale(lexicon_csv, binary)
+
+def test_other_files_are_rejected(tmp_path):
+    path = str(tmp_path / 'not.lex')
+    with open(path, 'wb') as f:
+        f.write(b'\x00' * 64)
+    with pytest.raises(ValueError):
+        Lexicon(path)
+    assert is_stale(path, path)
+    assert is_stale(path, os.path.join(str(tmp_path), 'missing.lex'))
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from conftest import ROOT
+from make_synopsis import PARADIGM_CELLS, Noun, noun_paradigm, paradigm_table
+from reverse_index import read_noun_stems
+
+PARADIGMS = {
+        'rēg': ('rēx', 'rēgis', 'rēgī', 'rēgem', 'rēge', 'rēx',
+            'rēgēs', 'rēgum', 'rēgibus', 'rēgēs', 'rēgibus', 'rēgēs'),
+        'mīlet': ('mīles', 'mīlitis', 'mīlitī', 'mīlitem', 'mīlite', 'mīles',
+            'mīlitēs', 'mīlitum', 'mīlitibus', 'mīlitēs', 'mīlitibus', 'mīlitēs'),
+        'fīlia': ('fīlia', 'fīliae', 'fīliae', 'fīliam', 'fīliā', 'fīlia',
+            'fīliae', 'fīliārum', 'fīliīs', 'fīliās', 'fīliīs', 'fīliae'),
+        'fīlio': ('fīlius', 'fīliī', 'fīliī', 'fīlium', 'fīliō', 'fīlī',
+            'fīliī', 'fīliōrum', 'fīliīs', 'fīliōs', 'fīliīs', 'fīliī'),
+        'manu': ('manus', 'manūs', 'manuī', 'manum', 'manū', 'manus',
+            'manūs', 'manuum', 'manibus', 'manūs', 'manibus', 'manūs'),
+        'flāmen': ('flāmen', 'flāminis', 'flāminī', 'flāminem', 'flāmine', 'flāmen',
+            'flāminēs', 'flāminum', 'flāminibus', 'flāminēs', 'flāminibus', 'flāminēs'),
+        }
+
+@pytest.mark.parametrize('stem', sorted(PARADIGMS))
+def test_noun_paradigm(stem):
+    assert noun_paradigm(stem, None) == PARADIGMS[stem]
+
+@pytest.mark.parametrize('stem', sorted(PARADIGMS))
+def test_paradigm_is_every_cell_of_noun(stem):
+    noun = Noun(stem, None)
+    assert tuple(getattr(noun, cell)() for cell in PARADIGM_CELLS) == PARADIGMS[stem]
+    assert noun.paradigm() == dict(zip(PARADIGM_CELLS, PARADIGMS[stem]))
+
+def test_paradigm_table_of_samples():
+    assert paradigm_table(list(PARADIGMS) + ['rēg']) == PARADIGMS
+
+def test_paradigm_table_matches_noun_paradigm_for_the_lexicon():
+    # -ro stems are syllabified with cltk
+    pytest.importorskip('cltk')
+
+    stems = read_noun_stems(os.path.join(ROOT, 'ap_pos.csv'))
+    expected = {}
+    for stem in stems:
+        try:
+            expected[stem] = noun_paradigm(stem, None)
+        except (IndexError, KeyError, TypeError):
+            expected[stem] = None
+    assert paradigm_table(stems) == expected
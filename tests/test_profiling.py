@@ -0,0 +1,22 @@
+from profiling import NULL_PROFILER, Profiler
+
+def test_stage_tokens_can_be_set_in_the_body():
+    profiler = Profiler()
+    for tokens in ([1, 2, 3], [4]):
+        with profiler.stage('normalization') as stage:
+            stage.tokens = len(tokens)
+    seconds, calls, tokens = profiler.stages['normalization']
+    assert (calls, tokens) == (2, 4)
+
+    with NULL_PROFILER.stage('normalization') as stage:
+        stage.tokens = 3
+
+def test_merged_caches_add_up():
+    first, second = Profiler(), Profiler()
+    first.count_cache('lexicon', 3, 1)
+    second.count_cache('lexicon', 1, 3)
+    second.count_cache('paradigms', 0, 0)
+    first.merge(second.report())
+    report = first.report()
+    assert report['caches']['lexicon'] == {'hits': 4, 'misses': 4, 'hit_rate': 0.5}
+    assert report['caches']['paradigms']['hit_rate'] is None
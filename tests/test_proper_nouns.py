@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cache import BoundedCache
+from process_txt_file import ProperNounTagger
+
+WORDS = ['Arma', 'uirumque', 'canō', 'Troiae', 'quī', 'prīmus', 'ab', 'ōrīs',
+        'Ītaliam', 'fātō', 'profugus', 'L.', 'Caesar', 'arma', 'Arma']
+
+def test_cache_evicts_least_recently_used():
+    cache = BoundedCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+def test_cache_can_be_shared_by_threads():
+    cache = BoundedCache(64)
+
+    def churn(start):
+        for i in range(start, start + 5000):
+            cache.put(i % 200, i)
+            cache.get((i * 7) % 200)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(churn, range(0, 40000, 5000)))
+    assert len(cache) == 64
+    assert cache.hits + cache.misses == 40000
+
+def test_batch_matches_tagging_each_word():
+    pytest.importorskip('cltk.tag.ner')
+    pytest.importorskip('nltk.tokenize.punkt')
+
+    single = ProperNounTagger()
+    expected = [single._tag_one(word) for word in WORDS]
+    assert ProperNounTagger().tag(WORDS) == expected
+
+def test_verdicts_are_cached():
+    pytest.importorskip('cltk.tag.ner')
+    pytest.importorskip('nltk.tokenize.punkt')
+
+    tagger = ProperNounTagger()
+    first = tagger.tag(WORDS)
+    misses = tagger.cache.misses
+    assert tagger.tag(WORDS) == first
+    assert tagger.cache.misses == misses
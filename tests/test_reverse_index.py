@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from make_synopsis import PARADIGM_CELLS, noun_paradigm
+from reverse_index import ReverseIndex, build_reverse_index
+
+STEMS = ['rēg', 'mīlet', 'fīlia', 'manu']
+
+def expected_parses(stems):
+    """ form -> set of (stem, case, number), straight from noun_paradigm """
+
+    parses = {}
+    for stem in stems:
+        for cell, form in zip(PARADIGM_CELLS, noun_paradigm(stem, None)):
+            case, number = cell.split('_')
+            parses.setdefault(form, set()).add((stem, case, number))
+    return parses
+
+def test_parses_match_noun_paradigm():
+    index = build_reverse_index(STEMS)
+    expected = expected_parses(STEMS)
+    assert index.stems == STEMS
+    assert index.skipped == []
+    assert len(index) == len(expected)
+    for form, parses in expected.items():
+        assert form in index
+        assert set(index.parse(form)) == parses
+        assert len(index.parse(form)) == len(parses)
+
+    assert set(index.parse('rēgibus')) == {('rēg', 'dat', 'pl'), ('rēg', 'abl', 'pl')}
+    assert index.parse('rēgibusque') == []
+
+def test_parse_tokens():
+    index = build_reverse_index(STEMS)
+    tokens = ['manūs', 'fīliae', 'manūs', 'arma']
+    parsed = index.parse_tokens(tokens)
+    assert sorted(parsed) == ['arma', 'fīliae', 'manūs']
+    assert parsed['arma'] == []
+    assert parsed['manūs'] == index.parse('manūs')
+    assert {parse[0] for parse in parsed['fīliae']} == {'fīlia'}
+
+def test_add_noun_matches_build():
+    index = ReverseIndex()
+    for stem in STEMS:
+        assert index.add_noun(stem)
+    assert index.forms == build_reverse_index(STEMS).forms
+    assert not index.add_paradigm('nihil', None)
+    assert index.skipped == ['nihil']
+
+def test_save_and_load(tmp_path):
+    index = build_reverse_index(STEMS)
+    path = str(tmp_path / 'forms.json')
+    index.save(path)
+    loaded = ReverseIndex.load(path)
+    assert loaded.stems == index.stems
+    assert loaded.forms == index.forms
+    assert loaded.parse('mīlitum') == index.parse('mīlitum')
+
+    with open(path) as f:
+        data = json.load(f)
+    data['cells'] = list(reversed(data['cells']))
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    with pytest.raises(ValueError):
+        ReverseIndex.load(path)
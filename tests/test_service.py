@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+import pytest
+
+import service as service_module
+from process_txt_file import count_word_forms, get_normalizer
+from service import LocalClient, ParserService, ServiceBusy
+
+TEXT = """Arma virumque canō, Trōiae quī prīmus ab ōrīs
+Ītaliam fātō profugus Lāvīniaque vēnit lītora. Mūsa, mihī causās
+memorā, quō nūmine laesō quidve dolēns rēgīna deum tot volvere cāsūs
+īnsignem pietāte virum. Urbs antīqua fuit. Tyriī tenuēre colōnī."""
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 30))
+
+def service(workers=2,**limits):
+    return ParserService(workers=workers, use_processes=False, **limits)
+
+def test_results_match_compile_lemmata():
+    pytest.importorskip('cltk')
+    sentences = get_normalizer().sentences(TEXT)
+
+    async def analyse():
+        async with service(max_in_flight=2) as parser:
+            client = LocalClient(parser)
+            return await client.analyse(TEXT), await client.count_forms(TEXT)
+
+    results, counts = run(analyse())
+    assert [result['index'] for result in results] == list(range(len(sentences)))
+    assert [result['sentence'] for result in results] == sentences
+    assert counts == count_word_forms(sentences)
+
+def test_stopping_early_frees_the_slots():
+    pytest.importorskip('cltk')
+
+    async def stop_early():
+        async with service(max_in_flight=1, max_requests=1) as parser:
+            client = LocalClient(parser)
+            async for result in client.stream(TEXT):
+                break
+            # would wait forever if the first request kept its slots
+            return await client.count_forms(TEXT)
+
+    assert run(stop_early()) == count_word_forms(get_normalizer().sentences(TEXT))
+
+def test_requests_queue_up_to_a_limit():
+    pytest.importorskip('cltk')
+
+    async def crowd():
+        async with service(max_requests=1, max_queued=1) as parser:
+            first = parser.process(TEXT)
+            await first.__anext__()
+
+            # the second request waits for the first to finish
+            second = asyncio.create_task(LocalClient(parser).analyse(TEXT))
+            while parser.queued == 0:
+                await asyncio.sleep(0)
+            with pytest.raises(ServiceBusy):
+                await parser.process(TEXT).__anext__()
+
+            async for result in first:
+                pass
+            return len(await second)
+
+    assert run(crowd()) == len(get_normalizer().sentences(TEXT))
+
+def test_running_sentences_keep_their_slots(monkeypatch):
+    release = threading.Event()
+    lock = threading.Lock()
+    running = {'now': 0, 'most': 0}
+
+    def slow(index, sentence, enclitics):
+        with lock:
+            running['now'] += 1
+            running['most'] = max(running['most'], running['now'])
+        release.wait(10)
+        with lock:
+            running['now'] -= 1
+        return {'index': index, 'sentence': sentence, 'forms': [], 'proper_nouns': []}
+
+    monkeypatch.setattr(service_module, 'warm_up', lambda: None)
+    monkeypatch.setattr(service_module, 'analyse_sentence', slow)
+    monkeypatch.setattr(service_module, 'split_sentences',
+            lambda text: text.split('. '))
+
+    async def stop_early():
+        # more workers than slots, so only the slots limit the sentences
+        async with service(workers=6, max_in_flight=2) as parser:
+            client = LocalClient(parser)
+            first = asyncio.create_task(client.analyse(TEXT))
+            while running['now'] < 2:
+                await asyncio.sleep(0.01)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            # the running sentences cannot be stopped and keep their slots
+            assert parser.in_flight == 2
+
+            second = asyncio.create_task(client.analyse(TEXT))
+            await asyncio.sleep(0.1)
+            assert parser.in_flight == 2
+            release.set()
+            results = await second
+            assert parser.in_flight == 0
+            return len(results)
+
+    assert run(stop_early()) == len(TEXT.split('. '))
+    assert running['most'] == 2
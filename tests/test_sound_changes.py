@@ -0,0 +1,35 @@
+import os
+
+from benchmarks import ListStem
+from conftest import ROOT
+from make_synopsis import COMPILED_SOUND_CHANGES, SAMPLE_NOUNS, Stem
+from reverse_index import read_noun_stems
+
+METHODS = ['add_s', 'add_m', 'add_ei', 'add_ns', 'add_sum', 'add_e', 'add_is',
+        'add_eis', 'add_es', 'add_um', 'add_ibus', 'rhotacism']
+
+# stems of every final letter the rules name, and some short ones
+EXTRA_STEMS = ['a', 'i', 'o', 'ē', 'ae', 'spē', 'diē', 'opus', 'genus', 'corpos',
+        'arbōs', 'uirgon', 'nōmen', 'pater', 'sorōr', 'duc', 'lēg', 'pāc',
+        'mare', 'animal', 'cornu', 'rē', 'puero', 'agro', 'domino']
+
+def outcome(stem, method):
+    """ the result of a method, or the type of the error it raises """
+    try:
+        return getattr(stem, method)()
+    except Exception as error:
+        return type(error)
+
+def stems():
+    lexicon = read_noun_stems(os.path.join(ROOT, 'ap_pos.csv'))
+    return lexicon + [stem for stem, gender in SAMPLE_NOUNS] + EXTRA_STEMS
+
+def test_rule_table_matches_the_branching_code():
+    for stem in stems():
+        for method in METHODS:
+            assert outcome(Stem(stem), method) == outcome(ListStem(stem), method), \
+                    (stem, method)
+
+def test_every_ending_is_compiled():
+    assert set(COMPILED_SOUND_CHANGES) == {method[4:] for method in METHODS
+            if method.startswith('add_')}
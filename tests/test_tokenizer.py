@@ -0,0 +1,47 @@
+from process_txt_file import JV_TABLE
+from tokenizer import MACRON_TABLE, fold_macrons, tokenize
+
+def texts(text, *args, **kwargs):
+    return [token.text for token in tokenize(text, *args, **kwargs)]
+
+def test_punctuation_and_numerals_only_separate_words():
+    assert texts("lītora, multum ille  et terrīs\niactātus et altō;  5") == [
+            'lītora', 'multum', 'ille', 'et', 'terrīs', 'iactātus', 'et', 'altō']
+    assert texts("ego—sed ūnam15 (Tyriī)") == ['ego', 'sed', 'ūnam', 'Tyriī']
+    assert texts("\ufeff, ; 12") == []
+
+def test_abbreviations_keep_their_period():
+    tokens = list(tokenize("L. Caesar a. d. III Kal. Mart. uēnit."))
+    assert [token.text for token in tokens] == ['L.', 'Caesar', 'a. d.', 'III',
+            'Kal.', 'Mart.', 'uēnit']
+    assert [token.abbreviation for token in tokens] == [True, False, True, False,
+            True, True, False]
+
+def test_non_and_id_are_words_unless_a_month_follows():
+    assert texts("Quid dīcis? Non. Dīxit id. Hoc est Id.") == ['Quid', 'dīcis',
+            'Non', 'Dīxit', 'id', 'Hoc', 'est', 'Id']
+    assert texts("a. d. III Non. Nov. uēnit; Id. Mart. occīsus est") == ['a. d.',
+            'III', 'Non.', 'Nov.', 'uēnit', 'Id.', 'Mart.', 'occīsus', 'est']
+    # and once J/V have been replaced
+    assert texts("Non. Iun. et Non. Nou.", table=JV_TABLE) == ['Non.', 'Iun.', 'et',
+            'Non.', 'Nou.']
+
+def test_offsets_point_into_the_text():
+    text = "Arma virumque canō"
+    for token in tokenize(text, ('que',), JV_TABLE):
+        assert text[token.start:token.end].translate(JV_TABLE) == token.text
+    assert [token.base for token in tokenize(text, ('que',), JV_TABLE)] == [
+            'Arma', 'uirum', 'canō']
+
+def test_folding_macrons_keeps_offsets():
+    text = "Trōiae quī prīmus"
+    tokens = list(tokenize(text, table=MACRON_TABLE))
+    assert [token.text for token in tokens] == ['Troiae', 'qui', 'primus']
+    assert [text[token.start:token.end] for token in tokens] == [
+            'Trōiae', 'quī', 'prīmus']
+    assert fold_macrons(text) == 'Troiae qui primus'
+
+def test_editorial_marks_flag_words():
+    tokens = list(tokenize("arma [uirumque] canō †Trōiae quī† prīmus"))
+    assert [token.editorial for token in tokens] == [False, True, False, True,
+            True, False]
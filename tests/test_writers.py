@@ -0,0 +1,69 @@
+import csv
+import json
+import os
+
+import pytest
+
+from writers import (merge_counts, read_columnar, read_run, sorted_counts,
+        write_counts, write_run)
+
+COUNTS = {'arma': 3, 'uirum': 2, 'canō': 1, 'Trōiae': 1, 'quī': 4, 'a|b': 1,
+        'ab,c': 2, '': 1}
+
+def test_run_round_trip(tmp_path):
+    items = sorted(COUNTS.items())
+    path = write_run(items, str(tmp_path))
+    assert list(read_run(path, remove=False)) == items
+    assert list(read_run(path)) == items
+    assert not os.path.exists(path)
+
+def test_merge_counts_adds_duplicates():
+    first = [('arma', 1), ('canō', 2)]
+    second = [('arma', 2), ('uirum', 1)]
+    assert list(merge_counts(first, second, [])) == [
+            ('arma', 3), ('canō', 2), ('uirum', 1)]
+
+def test_sorted_counts_spills_and_cleans_up(tmp_path):
+    items = list(COUNTS.items()) * 3
+    assert list(sorted_counts(items, max_items=2, directory=str(tmp_path))) == \
+            sorted((form, count * 3) for form, count in COUNTS.items())
+    assert os.listdir(tmp_path) == []
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return [(form, int(count)) for count, form in
+                csv.reader(f, delimiter=",", quotechar="|")]
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [(row['form'], row['count']) for row in map(json.loads, f)]
+
+@pytest.mark.parametrize('output_format, read', [
+        ('csv', read_csv), ('jsonl', read_jsonl), ('columnar', read_columnar)])
+def test_writers_round_trip(tmp_path, output_format, read):
+    path = str(tmp_path / f"forms.{output_format}")
+    write_counts(COUNTS.items(), path, output_format, max_items=3)
+    assert list(read(path)) == sorted(COUNTS.items())
+    assert os.listdir(tmp_path) == [f"forms.{output_format}"]
+
+def test_columnar_rejects_other_files(tmp_path):
+    path = tmp_path / 'forms.csv'
+    path.write_bytes(b'count,form\n' * 4)
+    with pytest.raises(ValueError):
+        list(read_columnar(str(path)))
+
+def test_unique_forms_match_the_csv_writer(tmp_path):
+    from process_txt_file import write_unique_forms
+
+    write_unique_forms(COUNTS, str(tmp_path / 'a.json'), 'json')
+    with open(tmp_path / 'a.json', encoding='utf-8') as f:
+        assert json.load(f) == COUNTS
+    write_unique_forms(COUNTS, str(tmp_path / 'a.csv'), 'csv', max_items=2)
+
+    # byte for byte what the script wrote before the writers module
+    with open(tmp_path / 'b.csv', 'w', newline='') as f:
+        csv_writer = csv.writer(f, delimiter=",",
+                quotechar="|", quoting=csv.QUOTE_MINIMAL)
+        for key, value in sorted(COUNTS.items()):
+            csv_writer.writerow([value, key])
+    assert (tmp_path / 'a.csv').read_bytes() == (tmp_path / 'b.csv').read_bytes()
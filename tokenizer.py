@@ -0,0 +1,261 @@
+import re
+
+QUE_BASE_FORMS = (
+        'quis','quid','cuius','cui','quō','quā','quī',
+        'quōrum','quārum','quibus','quae','quod',
+        'quōs','quās',
+        "uter","utra","utrum","utrīus","utrius","utrī",
+        "utram","utrō","utrā","utrae","utrōrum","utrārum",
+        "utrīs","utrōs","utrās",
+        "plērus","plēra","plērum","plērī","plērae","plērō",
+        "plērum","plērā","plērōrum","plērārum","plērīs",
+        "plērōs","plērās"
+        )
+
+# words ending in 'que' where 'que' is not the enclitic
+QUE_WORDS = frozenset(
+        ['atque','dēnique','itaque','namque','neque',
+        'quoque','undique']
+        + [word + "que" for word in QUE_BASE_FORMS]
+        + [word + "cumque" for word in QUE_BASE_FORMS]
+        )
+
+NE_WORDS = frozenset([
+        'bene','sine','paene','pōne','omne','īnsigne'
+        ])
+
+VE_WORDS = frozenset([
+        'sīve','sive','nēve','neve','sīue','siue','nēue','neue'
+        ])
+
+# a word the lexicon knows whole that ends like this is a case form
+# of the same lemma as its stem, as the ablative legiōne is of legiō,
+# not the stem with -ne
+NE_KEPT = ('ōne', 'one')
+
+# surface spelling : (enclitic, exempt words, endings that keep a
+# known word whole, whether the stem must be a known form). Words
+# ending in -ne and -ve are too many to list, e.g. breue, graue,
+# leue, cane, so those enclitics are only split when the lexicon
+# confirms what is left
+ENCLITIC_RULES = {
+        'que' : ('que', QUE_WORDS, (), False),
+        'ne' : ('ne', NE_WORDS, NE_KEPT, True),
+        've' : ('ve', VE_WORDS, (), True),
+        'ue' : ('ve', VE_WORDS, (), True),
+        }
+
+# the enclitics that need known forms to be split
+CONFIRMED_ENCLITICS = frozenset(rule[0] for rule in ENCLITIC_RULES.values() if rule[3])
+
+# longest spellings are tried first so that 'que' shadows 'ue'
+ENCLITIC_LENGTHS = tuple(sorted({len(key) for key in ENCLITIC_RULES},
+        reverse=True))
+
+# every spelling, in lower and upper case, to screen words before
+# split_enclitic looks at them
+ENCLITIC_ENDINGS = tuple(ENCLITIC_RULES) + tuple(key.upper() for key in ENCLITIC_RULES)
+
+# vowels marked long or short, precomposed or followed by a combining
+# macron or breve as after NFD normalization, folded in one translate
+MACRON_TABLE = str.maketrans('āēīōūȳӯĀĒĪŌŪȲăĕĭŏŭĂĔĬŎŬ',
+        'aeiouyyAEIOUYaeiouAEIOU', '\u0304\u0306')
+
+def fold_macrons(text):
+    """ Return text without macrons or breves, precomposed or combining """
+
+    return text.translate(MACRON_TABLE)
+
+MONTHS = (
+        'Ian','Iān','Jan','Feb','Mart','Apr','April','Aprīl','Mai',
+        'Iun','Iūn','Jun','Iul','Iūl','Jul','Sext','Sept','Oct','Nov','Dec',
+        )
+
+# praenomina, calendar terms and months that are written with a period
+ABBREVIATIONS = (
+        'A','Ap','C','Cn','D','K','L','M','Mam','N','P','Q','Ser','Sex',
+        'Sp','T','Ti','V',
+        'Kal','Non','Id','Īd',
+        ) + MONTHS
+
+def _jv(spellings):
+    """ the spellings and as they are spelled once J/V have been replaced """
+    table = str.maketrans('JjVv', 'IiUu')
+    return frozenset(spellings + tuple(spelling.translate(table) for spelling in spellings))
+
+ABBREVIATION_SET = _jv(ABBREVIATIONS)
+
+# calendar terms that are also words, nōn and id: their period is only
+# kept before a month, as in 'Non. Mai.' or 'a. d. III Id. Mart.'
+CALENDAR_WORDS = frozenset(['Non', 'Nōn', 'Id', 'Īd'])
+MONTH_FOLLOWS = re.compile(r'\s*(?:{})'.format('|'.join(sorted(_jv(MONTHS)))))
+
+# letters, with any combining marks such as a decomposed macron
+WORD = r'[^\W\d_]+(?:[\u0300-\u036f]+[^\W\d_]*)*'
+
+TOKEN = re.compile(rf"""
+        (?P<ante_diem>\ba\.\s*d\.)
+        |(?P<word>{WORD})(?P<period>\.)?
+        |(?P<mark>[\[\]<>†])
+        """, re.VERBOSE)
+
+OPENING_MARKS = frozenset('[<')
+CLOSING_MARKS = frozenset(']>')
+
+def _confirmed(known,word,stem):
+    """
+    Return True if stem is a known form and word, if known too,
+    is only a form of the same lemmata, as 'quidue' is of quis;
+    'exue', of exuō, is not 'ex' with -ve
+    """
+
+    if known is None:
+        return False
+    stem_lemmata = known.get(stem)
+    if not stem_lemmata:
+        return False
+    return set(known.get(word) or ()) <= set(stem_lemmata)
+
+def split_enclitic(word,enclitics=('que',),known=None):
+    """
+    Return the word without an enclitic from ENCLITIC_RULES and
+    the enclitic removed, or the word and None. known maps lower
+    case forms to their lemmata, as a Lemmatizer does; -ne and
+    -ve are only split when it confirms the stem, whatever
+    letter comes before, as in mēne, tantaene and comitemne,
+    and never without it.
+    """
+
+    lowered = word.lower()
+    for length in ENCLITIC_LENGTHS:
+        if len(word) <= length:
+            continue
+        rule = ENCLITIC_RULES.get(word[-length:])
+        if rule is None:
+            continue
+        enclitic, exemptions, kept, confirmed = rule
+        if enclitic in enclitics and lowered not in exemptions:
+            if not confirmed:
+                return word[:-length], enclitic
+            stem = lowered[:-length]
+            if (_confirmed(known, lowered, stem)
+                    and not (lowered.endswith(kept) and known.get(lowered))):
+                return word[:-length], enclitic
+        break
+
+    return word, None
+
+class Token:
+    """
+
+    Token is one word found by tokenize(), with the place in
+    the text it came from
+
+    ...
+
+    Attributes
+    ----------
+    text : str
+        the word, after the translation table if one was given
+
+    start, end : int
+        the word's offsets in the text that was tokenized
+
+    base : str
+        text without its enclitic
+
+    enclitic : str
+        the enclitic split from text, or None
+
+    abbreviation : bool
+        True for an abbreviation such as 'L.'; text keeps
+        the period and no enclitic is split off
+
+    editorial : bool
+        True inside editorial brackets or between cruces
+
+    """
+
+    __slots__ = ('text', 'start', 'end', 'base', 'enclitic', 'abbreviation',
+            'editorial')
+
+    def __init__(self,text,start,end,base,enclitic=None,abbreviation=False,
+            editorial=False):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.base = base
+        self.enclitic = enclitic
+        self.abbreviation = abbreviation
+        self.editorial = editorial
+
+    def __repr__(self):
+        return f"Token({self.text!r}, {self.start}, {self.end})"
+
+def tokenize(text,enclitics=(),table=None,known=None):
+    """
+    Yield a Token for every word of text in one scan with the
+    compiled TOKEN pattern. Numerals, punctuation and spacing
+    only separate words, so no empty tokens are produced;
+    editorial marks are dropped but flag the words they
+    enclose. If table is given the words are translated with
+    it, in one pass over the text where the table keeps its
+    length; offsets always point into the text as given.
+    Any of the enclitics are then split off each word, with
+    known as for split_enclitic().
+    """
+
+    # a table that deletes characters, such as combining macrons, would
+    # move the offsets, so then each word is translated on its own
+    per_word = None
+    if table is not None:
+        translated = text.translate(table)
+        if len(translated) == len(text):
+            text = translated
+        else:
+            per_word = table
+
+    depth = 0
+    crux = False
+    editorial = False
+    for match in TOKEN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'period':
+            # a word and the period after it: only an abbreviation keeps it
+            word = match.group('word')
+            if word in ABBREVIATION_SET and (word not in CALENDAR_WORDS
+                    or MONTH_FOLLOWS.match(text, match.end())):
+                start, end = match.span()
+                if per_word is not None:
+                    word = word.translate(per_word)
+                yield Token(word + '.', start, end, word + '.', None, True, editorial)
+                continue
+            kind = 'word'
+        else:
+            word = match.group()
+
+        if kind == 'word':
+            start, end = match.span('word')
+            if per_word is not None:
+                word = word.translate(per_word)
+            if enclitics and word.endswith(ENCLITIC_ENDINGS):
+                base, enclitic = split_enclitic(word.lower(), enclitics, known)
+                yield Token(word, start, end, word[:len(base)], enclitic, False, editorial)
+            else:
+                yield Token(word, start, end, word, None, False, editorial)
+            continue
+
+        if kind == 'ante_diem':
+            start, end = match.span()
+            if per_word is not None:
+                word = word.translate(per_word)
+            yield Token(word, start, end, word, None, True, editorial)
+            continue
+
+        if word in OPENING_MARKS:
+            depth += 1
+        elif word in CLOSING_MARKS:
+            depth = max(depth - 1, 0)
+        else:
+            crux = not crux
+        editorial = depth > 0 or crux
@@ -0,0 +1,196 @@
+from array import array
+from heapq import merge
+import csv
+import json
+import os
+import struct
+import tempfile
+
+BUFFER_SIZE = 1 << 16
+
+# a spilled run is a sequence of records: count, form length, form
+RUN_RECORD = struct.Struct('<qI')
+
+COLUMNAR_MAGIC = b'LATFRQ\x00\x01'
+# magic, rows, blob bytes
+COLUMNAR_HEADER = struct.Struct('<8sqq')
+
+def write_run(items,directory=None):
+    """ Write sorted (form, count) pairs to a temporary run file """
+
+    f = tempfile.NamedTemporaryFile('wb', suffix='.run', dir=directory,
+            delete=False, buffering=BUFFER_SIZE)
+    with f:
+        for form, count in items:
+            data = form.encode('utf-8')
+            f.write(RUN_RECORD.pack(count, len(data)))
+            f.write(data)
+    return f.name
+
+def read_run(path,remove=True):
+    """ Yield the (form, count) pairs of a run file, removing it after """
+
+    try:
+        with open(path, 'rb', buffering=BUFFER_SIZE) as f:
+            while True:
+                record = f.read(RUN_RECORD.size)
+                if not record:
+                    break
+                count, size = RUN_RECORD.unpack(record)
+                yield f.read(size).decode('utf-8'), count
+    finally:
+        if remove:
+            os.remove(path)
+
+def merge_counts(*runs):
+    """
+    Yield (form, count) pairs from runs already sorted by form,
+    in order, adding together the counts of a form that is in
+    more than one run.
+    """
+
+    form = None
+    total = 0
+    for next_form, count in merge(*runs):
+        if next_form == form:
+            total += count
+            continue
+        if form is not None:
+            yield form, total
+        form, total = next_form, count
+    if form is not None:
+        yield form, total
+
+def sorted_counts(items,max_items=1 << 20,directory=None):
+    """
+    Yield (form, count) pairs sorted by form. Up to max_items
+    pairs are sorted in memory; past that each sorted batch
+    is spilled to a run file and the runs are merged back
+    lazily, so the whole table never has to be held at once.
+    """
+
+    runs = []
+    batch = []
+    try:
+        for item in items:
+            batch.append(item)
+            if len(batch) >= max_items:
+                batch.sort()
+                runs.append(write_run(batch, directory))
+                batch = []
+        batch.sort()
+    except BaseException:
+        for path in runs:
+            os.remove(path)
+        raise
+
+    if not runs:
+        yield from merge_counts(batch)
+        return
+    yield from merge_counts(batch, *[read_run(path) for path in runs])
+
+class CsvWriter:
+    """ Writes count,form rows with | as the quote character """
+
+    def __init__(self,path):
+        self._file = open(path, 'w', newline='', buffering=BUFFER_SIZE)
+        self._writer = csv.writer(self._file, delimiter=",",
+                quotechar="|", quoting=csv.QUOTE_MINIMAL)
+
+    def write(self,form,count):
+        self._writer.writerow([count, form])
+
+    def close(self):
+        self._file.close()
+
+class JsonLinesWriter:
+    """ Writes one {"form": ..., "count": ...} object per line """
+
+    def __init__(self,path):
+        self._file = open(path, 'w', encoding='utf-8', buffering=BUFFER_SIZE)
+
+    def write(self,form,count):
+        self._file.write(json.dumps({'form': form, 'count': count},
+                ensure_ascii=False))
+        self._file.write('\n')
+
+    def close(self):
+        self._file.close()
+
+class ColumnarWriter:
+    """
+    Writes the forms and counts as columns: a header, the
+    UTF-8 forms back to back, then an array of the offsets
+    where each form ends and an array of the counts. The
+    forms are streamed to disk; only the two integer columns
+    are held until close(), which also fills in the header.
+    """
+
+    def __init__(self,path):
+        self._file = open(path, 'wb', buffering=BUFFER_SIZE)
+        self._file.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, 0, 0))
+        self._ends = array('Q')
+        self._counts = array('q')
+        self._size = 0
+
+    def write(self,form,count):
+        data = form.encode('utf-8')
+        self._file.write(data)
+        self._size += len(data)
+        self._ends.append(self._size)
+        self._counts.append(count)
+
+    def close(self):
+        self._file.write(b'\x00' * (-self._size % 8))
+        self._file.write(self._ends.tobytes())
+        self._file.write(self._counts.tobytes())
+        self._file.seek(0)
+        self._file.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC,
+                len(self._counts), self._size))
+        self._file.close()
+
+def read_columnar(path):
+    """ Yield the (form, count) pairs of a file from ColumnarWriter """
+
+    with open(path, 'rb') as f:
+        magic, rows, size = COLUMNAR_HEADER.unpack(f.read(COLUMNAR_HEADER.size))
+        if magic != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar word form file")
+        blob = f.read(size + (-size % 8))
+        ends = array('Q')
+        ends.frombytes(f.read(rows * ends.itemsize))
+        counts = array('q')
+        counts.frombytes(f.read(rows * counts.itemsize))
+
+    start = 0
+    for end, count in zip(ends, counts):
+        yield blob[start:end].decode('utf-8'), count
+        start = end
+
+WRITERS = {
+        'csv': CsvWriter,
+        'jsonl': JsonLinesWriter,
+        'columnar': ColumnarWriter,
+        }
+
+def write_sorted_counts(items,path,output_format='csv'):
+    """
+    Stream (form, count) pairs already sorted by form to path
+    with the writer registered for output_format
+    """
+
+    writer = WRITERS[output_format](path)
+    try:
+        for form, count in items:
+            writer.write(form, count)
+    finally:
+        writer.close()
+
+def write_counts(items,path,output_format='csv',max_items=1 << 20):
+    """
+    Sort (form, count) pairs by form and stream them to path
+    with the writer registered for output_format
+    """
+
+    write_sorted_counts(sorted_counts(items, max_items,
+            os.path.dirname(os.path.abspath(path))), path, output_format)